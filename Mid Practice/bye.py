@@ -1,5 +1,6 @@
 # main.py
 import os
+import sys
 import time
 import base64
 from selenium import webdriver
@@ -11,9 +12,14 @@ from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from qr_http import BACKENDS, download_all
+from qr_manifest import MANIFEST_NAME, Manifest, output_path, pending_ids, read_member_ids
+from qr_pool import backoff_delay, run_pool, timing_summary, write_timings
+
 # --- Configuration ---
 # 1. THE WEBSITE URL IS CORRECTLY SET
-WEBSITE_URL = "https://uiudsc.uiu.ac.bd/qr-generator"
+# (QR_WEBSITE_URL overrides it, e.g. with the local stand-in page from qr_standin.py)
+WEBSITE_URL = os.environ.get("QR_WEBSITE_URL", "https://uiudsc.uiu.ac.bd/qr-generator")
 
 # 2. THE MEMBER IDS LIST IS POPULATED
 MEMBER_IDS = [
@@ -27,9 +33,50 @@ MEMBER_IDS = [
 # 3. THE DOWNLOAD DIRECTORY IS SET
 DOWNLOAD_DIRECTORY = r"C:/Musfique's Folder/UIU DSC/Events/Orientation"
 
+# 4. NUMBER OF HEADLESS BROWSERS RUNNING IN PARALLEL (1 = a single visible browser)
+WORKERS = int(os.environ.get("QR_WORKERS", "4"))
+
+# 5. "browser" drives the website; "http" fetches the PNGs from QR_API_URL and
+# "local" draws them, both without a browser (see qr_http.py)
+BACKEND = os.environ.get("QR_BACKEND", "browser")
+
+# 6. HOW TO WAIT FOR THE QR IMAGE: "event" resolves in the page as soon as the
+# image is set (MutationObserver); "poll" is the old 500 ms polling loop, kept
+# for comparing the two with the timings file
+WAIT_MODE = os.environ.get("QR_WAIT_MODE", "event")
+TIMINGS_FILE = "qr_timings.csv"
+
+QR_IMAGE_XPATH = "//div[contains(@class, 'rounded-xl') and .//div[contains(., 'Generated QR Code')]]//img"
+
+# Runs in the page: calls back with the QR image's data URL as soon as it is set
+# and differs from the previous one (the last ID's image may still be shown),
+# or with null after the timeout
+WAIT_FOR_QR_SCRIPT = """
+const [xpath, previousSrc, timeoutMs, done] = arguments;
+const currentSrc = () => {
+    const img = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const src = img && img.src;
+    return src && src.startsWith('data:image/png;base64,') && src !== previousSrc ? src : null;
+};
+const ready = currentSrc();
+if (ready) { done(ready); return; }
+const observer = new MutationObserver(() => {
+    const src = currentSrc();
+    if (src) { observer.disconnect(); clearTimeout(timer); done(src); }
+});
+const timer = setTimeout(() => { observer.disconnect(); done(null); }, timeoutMs);
+observer.observe(document.body, {subtree: true, childList: true, attributes: true, attributeFilter: ['src']});
+"""
+
+# 7. RESUMABLE RUNS: the IDs can also come from a CSV or text file given on the
+# command line (python bye.py member_ids.csv). Every outcome is logged to the
+# manifest, and IDs whose qr-<id>.png already exists are skipped next time.
+MANIFEST_FILE = os.path.join(DOWNLOAD_DIRECTORY, MANIFEST_NAME)
+MAX_ATTEMPTS = 3
+
 # --- Main Script ---
 
-def setup_driver():
+def setup_driver(headless=False):
     """Sets up a robust Chrome WebDriver."""
     
     if not os.path.exists(DOWNLOAD_DIRECTORY):
@@ -38,6 +85,9 @@ def setup_driver():
 
     chrome_options = webdriver.ChromeOptions()
     chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,900")
     chrome_options.add_argument("--incognito")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36")
     chrome_options.add_argument("--disable-gpu")
@@ -46,106 +96,151 @@ def setup_driver():
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
 
-def process_qr_codes(driver, member_ids):
+def current_qr_src(driver):
+    """The src of the QR image currently on the page, or None."""
+    images = driver.find_elements(By.XPATH, QR_IMAGE_XPATH)
+    return driver.execute_script("return arguments[0].src;", images[0]) if images else None
+
+def wait_for_qr_src(driver, previous_src=None, timeout=30):
+    """Waits in the page (no polling) for a new QR image data URL and returns it."""
+    driver.set_script_timeout(timeout + 5)
+    img_src = driver.execute_async_script(WAIT_FOR_QR_SCRIPT, QR_IMAGE_XPATH, previous_src, timeout * 1000)
+    if not img_src:
+        raise TimeoutException("Timed out waiting for QR code image src attribute to be populated.")
+    return img_src
+
+def poll_for_qr_src(driver, timeout=30):
+    """The old way: waits for the placeholder to go, then polls the image src every 500 ms."""
+    # Wait for the placeholder text to disappear.
+    placeholder_xpath = "//p[text()='Enter Member ID to generate QR code']"
+    WebDriverWait(driver, timeout).until(
+        EC.invisibility_of_element_located((By.XPATH, placeholder_xpath))
+    )
+
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        try:
+            # Re-find the element in each loop iteration to avoid stale element errors
+            qr_image = driver.find_element(By.XPATH, QR_IMAGE_XPATH)
+            # Use JavaScript to get the 'src' property, which is more reliable
+            img_src = driver.execute_script("return arguments[0].src;", qr_image)
+            if img_src and 'data:image/png;base64,' in img_src:
+                return img_src
+        except (StaleElementReferenceException, NoSuchElementException):
+            # The page was re-rendering, or the element isn't there yet.
+            # This is expected, so we just continue the loop.
+            pass
+        time.sleep(0.5)  # Wait 500ms before checking again
+    raise TimeoutException("Timed out waiting for QR code image src attribute to be populated.")
+
+def process_member_id(driver, member_id, log=print):
+    """
+    Generates the QR code of one member ID on the already open page and saves
+    it by extracting the image data directly from the page. Raises if any
+    step fails.
+    """
+    # --- Step 1: Find and fill the input field ---
+    log("  - Waiting for Member ID input field...")
+    member_id_input = WebDriverWait(driver, 30).until(
+        EC.visibility_of_element_located((By.NAME, "memberId"))
+    )
+
+    log("  - Clearing and entering text...")
+    member_id_input.send_keys(Keys.CONTROL + "a")
+    member_id_input.send_keys(Keys.DELETE)
+    member_id_input.send_keys(member_id)
+    log(f"  - Entered '{member_id}' into the input field.")
+
+    # --- Step 2: Find and click the "Generate QR Code" button ---
+    log("  - Waiting for 'Generate QR Code' button...")
+    generate_button = WebDriverWait(driver, 30).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
+    )
+    previous_src = current_qr_src(driver) if WAIT_MODE == "event" else None
+    generate_button.click()
+    log("  - Clicked 'Generate QR Code' button.")
+
+    # --- Step 3: Wait for the QR code image data ---
+    log("  - Waiting for QR code to generate...")
+    if WAIT_MODE == "event":
+        img_src = wait_for_qr_src(driver, previous_src)
+    else:
+        img_src = poll_for_qr_src(driver)
+    log("  - QR code image data has loaded.")
+
+    # --- Step 4: Now that the data is loaded, save the file ---
+    header, encoded_data = img_src.split(',', 1)
+    decoded_data = base64.b64decode(encoded_data)
+
+    file_path = output_path(DOWNLOAD_DIRECTORY, member_id)
+
+    with open(file_path, 'wb') as f:
+        f.write(decoded_data)
+    log(f"  - SUCCESS: QR code saved to {file_path}")
+
+def process_qr_codes(driver, member_ids, manifest=None):
     """
-    For each member ID, generates the QR code and saves it by extracting the
-    image data directly from the page using a JavaScript-powered polling loop.
+    For each member ID, generates the QR code and saves it, one at a time in
+    this one browser.
     """
     print("Navigating to the website...")
     driver.get(WEBSITE_URL)
+    timings = {}
     
     for member_id in member_ids:
-        try:
-            print(f"\nProcessing Member ID: {member_id}...")
-            
-            # --- Step 1: Find and fill the input field ---
-            print("  - Waiting for Member ID input field...")
-            member_id_input = WebDriverWait(driver, 30).until(
-                EC.visibility_of_element_located((By.NAME, "memberId"))
-            )
-            
-            print("  - Clearing and entering text...")
-            member_id_input.send_keys(Keys.CONTROL + "a")
-            member_id_input.send_keys(Keys.DELETE)
-            member_id_input.send_keys(member_id)
-            print(f"  - Entered '{member_id}' into the input field.")
-
-            # --- Step 2: Find and click the "Generate QR Code" button ---
-            print("  - Waiting for 'Generate QR Code' button...")
-            generate_button = WebDriverWait(driver, 30).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
-            )
-            generate_button.click()
-            print("  - Clicked 'Generate QR Code' button.")
-
-            # --- Step 3: Find the QR code image with a robust JavaScript polling loop ---
-            print("  - Waiting for QR code to generate...")
-
-            # 3a: Wait for the placeholder text to disappear.
-            placeholder_xpath = "//p[text()='Enter Member ID to generate QR code']"
-            WebDriverWait(driver, 30).until(
-                EC.invisibility_of_element_located((By.XPATH, placeholder_xpath))
-            )
-            print("  - Placeholder text disappeared. UI is updating.")
-            
-            # 3b: Define the robust XPath for the image.
-            qr_image_xpath = "//div[contains(@class, 'rounded-xl') and .//div[contains(., 'Generated QR Code')]]//img"
-            
-            # 3c: **FINAL, MOST ROBUST POLLING LOOP USING JAVASCRIPT**
-            print("  - Polling for QR code image data to load via JavaScript...")
-            start_time = time.time()
-            img_src = None
-            while time.time() - start_time < 30:  # 30-second timeout
-                try:
-                    # Re-find the element in each loop iteration to avoid stale element errors
-                    qr_image = driver.find_element(By.XPATH, qr_image_xpath)
-                    # Use JavaScript to get the 'src' property, which is more reliable
-                    img_src = driver.execute_script("return arguments[0].src;", qr_image)
-                    if img_src and 'data:image/png;base64,' in img_src:
-                        print("  - QR code image data has loaded.")
-                        break  # Exit the loop successfully
-                except (StaleElementReferenceException, NoSuchElementException):
-                    # The page was re-rendering, or the element isn't there yet.
-                    # This is expected, so we just continue the loop.
-                    pass
-                time.sleep(0.5)  # Wait 500ms before checking again
-            else:  # This 'else' belongs to the 'while' loop, it executes if the loop finishes without a 'break'
-                raise TimeoutException("Timed out waiting for QR code image src attribute to be populated.")
-
-            # 3d: Now that the data is loaded, save the file.
-            header, encoded_data = img_src.split(',', 1)
-            decoded_data = base64.b64decode(encoded_data)
-            
-            file_name = f"qr-{member_id}.png"
-            file_path = os.path.join(DOWNLOAD_DIRECTORY, file_name)
-            
-            with open(file_path, 'wb') as f:
-                f.write(decoded_data)
-            print(f"  - SUCCESS: QR code saved to {file_path}")
-            
-            time.sleep(1)
-
-        except TimeoutException as e:
-            print(f"  - A timeout error occurred while processing {member_id}: {e.msg}")
-            print("  - Refreshing page to try and recover...")
-            driver.refresh()
-            time.sleep(2)
-            continue
-        except Exception as e:
-            print(f"  - An unexpected error occurred while processing {member_id}: {e}")
-            print("  - Refreshing page to try and recover...")
-            driver.refresh()
-            time.sleep(2)
-            continue
+        print(f"\nProcessing Member ID: {member_id}...")
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                started = time.perf_counter()
+                process_member_id(driver, member_id)
+                timings[member_id] = time.perf_counter() - started
+                if manifest is not None:
+                    manifest.record(member_id, "ok", attempt, timings[member_id])
+                break
+
+            except Exception as e:
+                if isinstance(e, TimeoutException):
+                    print(f"  - A timeout error occurred while processing {member_id}: {e.msg}")
+                else:
+                    print(f"  - An unexpected error occurred while processing {member_id}: {e}")
+                print("  - Refreshing page to try and recover...")
+                # The next try waits for the input field, so no fixed pause is needed
+                driver.refresh()
+                if attempt < MAX_ATTEMPTS:
+                    delay = backoff_delay(attempt)
+                    print(f"  - Retrying in {delay:.1f} s (attempt {attempt + 1} of {MAX_ATTEMPTS})...")
+                    time.sleep(delay)
+                elif manifest is not None:
+                    manifest.record(member_id, "failed", attempt, error=f"{type(e).__name__}: {e}".strip())
+
+    return timings
 
 def main():
     """Main function to run the automation."""
-    driver = setup_driver()
-    process_qr_codes(driver, MEMBER_IDS)
-    
-    driver.quit()
+    if BACKEND not in ("browser", *BACKENDS):
+        raise ValueError(f"QR_BACKEND must be one of browser, {', '.join(BACKENDS)}; got {BACKEND!r}")
+    os.makedirs(DOWNLOAD_DIRECTORY, exist_ok=True)
+    member_ids = read_member_ids(sys.argv[1]) if len(sys.argv) > 1 else MEMBER_IDS
+    with Manifest(MANIFEST_FILE) as manifest:
+        member_ids = pending_ids(member_ids, DOWNLOAD_DIRECTORY, manifest)
+        if not member_ids:
+            print("Nothing left to do.")
+        elif BACKEND != "browser":
+            download_all(member_ids, DOWNLOAD_DIRECTORY, BACKEND, max_attempts=MAX_ATTEMPTS,
+                         timings_file=TIMINGS_FILE, manifest=manifest)
+        elif WORKERS > 1:
+            # Several headless browsers share the IDs (see qr_pool.py)
+            run_pool(member_ids, setup_driver, process_member_id, WEBSITE_URL, workers=min(WORKERS, len(member_ids)),
+                     max_attempts=MAX_ATTEMPTS, timings_file=TIMINGS_FILE, manifest=manifest)
+        else:
+            driver = setup_driver()
+            timings = process_qr_codes(driver, member_ids, manifest)
+            driver.quit()
+            write_timings(TIMINGS_FILE, timings)
+            print(f"\nLatency ({WAIT_MODE} wait): {timing_summary(timings)}; per-ID timings in {TIMINGS_FILE}")
+
     print("\nAutomation complete. All QR codes have been processed.")
-    print(f"Files should be saved in: {DOWNLOAD_DIRECTORY}")
+    print(f"Files should be saved in: {DOWNLOAD_DIRECTORY} (status of every ID in {MANIFEST_FILE})")
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,8 @@
 # main.py
 import os
+import sys
+import shutil
+import tempfile
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -9,9 +12,14 @@ from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from qr_http import BACKENDS, download_all
+from qr_manifest import MANIFEST_NAME, Manifest, output_path, pending_ids, read_member_ids
+from qr_pool import backoff_delay, run_pool, timing_summary, write_timings
+
 # --- Configuration ---
 # 1. THE WEBSITE URL IS CORRECTLY SET
-WEBSITE_URL = "https://uiudsc.uiu.ac.bd/qr-generator"
+# (QR_WEBSITE_URL overrides it, e.g. with the local stand-in page from qr_standin.py)
+WEBSITE_URL = os.environ.get("QR_WEBSITE_URL", "https://uiudsc.uiu.ac.bd/qr-generator")
 
 # 2. ADD ALL THE MEMBER IDS YOU WANT TO PROCESS HERE
 MEMBER_IDS = [
@@ -25,95 +33,206 @@ MEMBER_IDS = [
 # The download directory has been updated to your specified path.
 DOWNLOAD_DIRECTORY = r"C:/Musfique's Folder/UIU DSC/Events/Orientation"
 
+# 4. NUMBER OF HEADLESS BROWSERS RUNNING IN PARALLEL (1 = a single visible browser)
+WORKERS = int(os.environ.get("QR_WORKERS", "4"))
+
+# 5. "browser" drives the website; "http" fetches the PNGs from QR_API_URL and
+# "local" draws them, both without a browser (see qr_http.py)
+BACKEND = os.environ.get("QR_BACKEND", "browser")
+
+# 6. A DOWNLOAD COUNTS AS DONE WHEN ITS FILE LANDS ON DISK (at most this many seconds)
+DOWNLOAD_TIMEOUT = 30
+TIMINGS_FILE = "qr_timings.csv"
+
+# Chrome writes a download under one of these names until it is complete
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+# 7. RESUMABLE RUNS: the IDs can also come from a CSV or text file given on the
+# command line (python hi.py member_ids.csv). Every outcome is logged to the
+# manifest, and IDs whose qr-<id>.png already exists are skipped next time.
+MANIFEST_FILE = os.path.join(DOWNLOAD_DIRECTORY, MANIFEST_NAME)
+MAX_ATTEMPTS = 3
+
 # --- Main Script ---
 
-def setup_driver():
-    """Sets up the Chrome WebDriver with options to auto-download files."""
+class DownloadingChrome(webdriver.Chrome):
+    """
+    Chrome saving its downloads to download_directory. A private folder
+    (private=True) is deleted when the browser quits.
+    """
+
+    def __init__(self, download_directory, private=False, **kwargs):
+        super().__init__(**kwargs)
+        self.download_directory = download_directory
+        self.private = private
+
+    def quit(self):
+        try:
+            super().quit()
+        finally:
+            if self.private:
+                shutil.rmtree(self.download_directory, ignore_errors=True)
+
+def setup_driver(headless=False):
+    """
+    Sets up the Chrome WebDriver with options to auto-download files. Headless
+    drivers (the worker pool) download into a private folder of their own, so
+    each worker can tell its download apart; the file is moved to
+    DOWNLOAD_DIRECTORY afterwards.
+    """
     
     if not os.path.exists(DOWNLOAD_DIRECTORY):
         os.makedirs(DOWNLOAD_DIRECTORY)
         print(f"Created directory: {DOWNLOAD_DIRECTORY}")
+    download_directory = tempfile.mkdtemp(prefix="qr-downloads-") if headless else DOWNLOAD_DIRECTORY
 
     chrome_options = webdriver.ChromeOptions()
     prefs = {
-        "download.default_directory": DOWNLOAD_DIRECTORY,
+        "download.default_directory": os.path.abspath(download_directory),
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True
     }
     chrome_options.add_experimental_option("prefs", prefs)
     chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,900")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
+    try:
+        service = Service(ChromeDriverManager().install())
+        return DownloadingChrome(download_directory, private=headless, service=service, options=chrome_options)
+    except Exception:
+        if headless:
+            shutil.rmtree(download_directory, ignore_errors=True)
+        raise
 
-def process_qr_codes(driver, member_ids):
+def finished_downloads(directory):
+    """Names of the completed, non-empty files in directory."""
+    return {
+        entry.name for entry in os.scandir(directory)
+        if entry.is_file() and not entry.name.endswith(PARTIAL_SUFFIXES) and entry.stat().st_size > 0
+    }
+
+def wait_for_download(directory, before, timeout=DOWNLOAD_TIMEOUT):
+    """Waits until a completed file that is not in `before` lands in directory and returns its path."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        new_files = finished_downloads(directory) - before
+        if new_files:
+            return os.path.join(directory, min(new_files))
+        time.sleep(0.05)
+    raise TimeoutException(f"No download landed in {directory} within {timeout} s.")
+
+def process_member_id(driver, member_id, log=print):
+    """
+    Generates and downloads the QR code of one member ID on the already open
+    page, using the correct element selectors. Raises if any step fails.
+    """
+    # --- Step 1: Find the input field by its NAME attribute ---
+    # The 'name' attribute is stable, unlike the dynamic 'id'.
+    log("  - Waiting for Member ID input field...")
+    member_id_input = WebDriverWait(driver, 30).until(
+        EC.visibility_of_element_located((By.NAME, "memberId"))
+    )
+
+    log("  - Clearing and entering text...")
+    member_id_input.clear()
+    member_id_input.send_keys(member_id)
+    log(f"  - Entered '{member_id}' into the input field.")
+
+    # --- Step 2: Find and click the "Generate QR Code" button ---
+    log("  - Waiting for 'Generate QR Code' button...")
+    generate_button = WebDriverWait(driver, 30).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
+    )
+    log("  - Clicking 'Generate QR Code' button...")
+    generate_button.click()
+
+    # --- Step 3: Wait for and click the "Download QR Code" button ---
+    log("  - Waiting for 'Download QR Code' button...")
+    download_button = WebDriverWait(driver, 30).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Download QR Code')]"))
+    )
+    log("  - Clicking 'Download QR Code' button...")
+    before = finished_downloads(driver.download_directory)
+    # Using a JavaScript click here can be more reliable if a normal click fails.
+    driver.execute_script("arguments[0].click();", download_button)
+
+    # Done as soon as the file is complete on disk
+    file_path = wait_for_download(driver.download_directory, before)
+    # Saved as qr-<id>.png whatever the site names it, so later runs can skip it
+    target = output_path(DOWNLOAD_DIRECTORY, member_id)
+    if os.path.abspath(file_path) != os.path.abspath(target):
+        if os.path.exists(target):
+            os.remove(target)
+        shutil.move(file_path, target)
+        file_path = target
+    log(f"  - Downloaded {member_id} to {file_path}.")
+
+def process_qr_codes(driver, member_ids, manifest=None):
     """
     Navigates to the site, and for each member ID, generates and downloads
-    the corresponding QR code using the correct element selectors.
+    the corresponding QR code in this one browser.
     """
     print("Navigating to the website...")
     driver.get(WEBSITE_URL)
+    timings = {}
     
     for member_id in member_ids:
-        try:
-            print(f"\nProcessing Member ID: {member_id}...")
-            
-            # --- Step 1: Find the input field by its NAME attribute ---
-            # The 'name' attribute is stable, unlike the dynamic 'id'.
-            print("  - Waiting for Member ID input field...")
-            member_id_input = WebDriverWait(driver, 30).until(
-                EC.visibility_of_element_located((By.NAME, "memberId"))
-            )
-            
-            print("  - Clearing and entering text...")
-            member_id_input.clear()
-            member_id_input.send_keys(member_id)
-            print(f"  - Entered '{member_id}' into the input field.")
-
-            # --- Step 2: Find and click the "Generate QR Code" button ---
-            print("  - Waiting for 'Generate QR Code' button...")
-            generate_button = WebDriverWait(driver, 30).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
-            )
-            print("  - Clicking 'Generate QR Code' button...")
-            generate_button.click()
-
-            # --- Step 3: Wait for and click the "Download QR Code" button ---
-            print("  - Waiting for 'Download QR Code' button...")
-            download_button = WebDriverWait(driver, 30).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Download QR Code')]"))
-            )
-            print("  - Clicking 'Download QR Code' button...")
-            # Using a JavaScript click here can be more reliable if a normal click fails.
-            driver.execute_script("arguments[0].click();", download_button)
-            
-            # Wait for the download to start.
-            time.sleep(4) 
-            print(f"  - Download initiated for {member_id}.")
-
-        except TimeoutException:
-            print(f"  - A timeout error occurred while processing {member_id}. The element could not be found.")
-            print("  - Refreshing page to try and recover...")
-            driver.refresh()
-            time.sleep(3)
-            continue
-        except Exception as e:
-            print(f"  - An unexpected error occurred while processing {member_id}: {e}")
-            print("  - Refreshing page to try and recover...")
-            driver.refresh()
-            time.sleep(3)
-            continue
+        print(f"\nProcessing Member ID: {member_id}...")
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                started = time.perf_counter()
+                process_member_id(driver, member_id)
+                timings[member_id] = time.perf_counter() - started
+                if manifest is not None:
+                    manifest.record(member_id, "ok", attempt, timings[member_id])
+                break
+
+            except Exception as e:
+                if isinstance(e, TimeoutException):
+                    print(f"  - A timeout error occurred while processing {member_id}. The element could not be found.")
+                else:
+                    print(f"  - An unexpected error occurred while processing {member_id}: {e}")
+                print("  - Refreshing page to try and recover...")
+                # The next try waits for the input field, so no fixed pause is needed
+                driver.refresh()
+                if attempt < MAX_ATTEMPTS:
+                    delay = backoff_delay(attempt)
+                    print(f"  - Retrying in {delay:.1f} s (attempt {attempt + 1} of {MAX_ATTEMPTS})...")
+                    time.sleep(delay)
+                elif manifest is not None:
+                    manifest.record(member_id, "failed", attempt, error=f"{type(e).__name__}: {e}".strip())
+
+    return timings
 
 def main():
     """Main function to run the automation."""
-    driver = setup_driver()
-    process_qr_codes(driver, MEMBER_IDS)
-    
-    driver.quit()
+    if BACKEND not in ("browser", *BACKENDS):
+        raise ValueError(f"QR_BACKEND must be one of browser, {', '.join(BACKENDS)}; got {BACKEND!r}")
+    os.makedirs(DOWNLOAD_DIRECTORY, exist_ok=True)
+    member_ids = read_member_ids(sys.argv[1]) if len(sys.argv) > 1 else MEMBER_IDS
+    with Manifest(MANIFEST_FILE) as manifest:
+        member_ids = pending_ids(member_ids, DOWNLOAD_DIRECTORY, manifest)
+        if not member_ids:
+            print("Nothing left to do.")
+        elif BACKEND != "browser":
+            download_all(member_ids, DOWNLOAD_DIRECTORY, BACKEND, max_attempts=MAX_ATTEMPTS,
+                         timings_file=TIMINGS_FILE, manifest=manifest)
+        elif WORKERS > 1:
+            # Several headless browsers share the IDs (see qr_pool.py)
+            run_pool(member_ids, setup_driver, process_member_id, WEBSITE_URL, workers=min(WORKERS, len(member_ids)),
+                     max_attempts=MAX_ATTEMPTS, timings_file=TIMINGS_FILE, manifest=manifest)
+        else:
+            driver = setup_driver()
+            timings = process_qr_codes(driver, member_ids, manifest)
+            driver.quit()
+            write_timings(TIMINGS_FILE, timings)
+            print(f"\nLatency: {timing_summary(timings)}; per-ID timings in {TIMINGS_FILE}")
+
     print("\nAutomation complete. All QR codes have been processed.")
-    print(f"Files should be saved in: {DOWNLOAD_DIRECTORY}")
+    print(f"Files should be saved in: {DOWNLOAD_DIRECTORY} (status of every ID in {MANIFEST_FILE})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,229 @@
+"""
+Geohash grid for Meteorite_Landings.csv (or any table of geo points).
+
+Landings are binned into geohash cells at several precisions (zoom levels)
+once, aggregating count, total mass and fell/found per cell. Each level keeps
+its cells sorted by grid column, so a bounding-box query is a searchsorted
+slice plus a mask and returns only the visible cells.
+
+    from meteorite_grid import GeoGrid, load_landings, grid_map_figure
+    grid = GeoGrid.from_frame(load_landings())
+    cells = grid.query(bbox=(-130, 20, -60, 55))     # lon_min, lat_min, lon_max, lat_max
+    grid_map_figure(cells).show()
+
+    python meteorite_grid.py                          # writes meteorite_grid.html
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from meteorites import has_location, read_meteorites
+
+# --- Configuration ---
+DATA_FILE = 'Meteorite_Landings.csv'
+
+# Geohash precisions kept in the grid: 1 (~5000 km cells) to 5 (~5 km cells)
+PRECISIONS = (1, 2, 3, 4, 5)
+
+# Finest level used for a view is the one that covers it with at most this many cells
+MAX_VIEW_CELLS = 5_000
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+WORLD = (-180.0, -90.0, 180.0, 90.0)
+
+
+def load_landings(path=DATA_FILE):
+    """The typed landings (see meteorites.py) that have usable coordinates."""
+    df = read_meteorites(path)
+    return df[has_location(df)].reset_index(drop=True)
+
+
+def _grid_bits(precision):
+    """(longitude bits, latitude bits) of a geohash precision; longitude gets the odd bit."""
+    n_bits = 5 * precision
+    return (n_bits + 1) // 2, n_bits // 2
+
+
+def geohash_codes(lat, lon, precision):
+    """
+    Integer geohash of every point plus its grid column (ix) and row (iy).
+    The integer's base-32 digits are the usual geohash characters.
+    """
+    lon_bits, lat_bits = _grid_bits(precision)
+    ix = np.clip(((np.asarray(lon, dtype='float64') + 180) / 360 * (1 << lon_bits)).astype('int64'),
+                 0, (1 << lon_bits) - 1)
+    iy = np.clip(((np.asarray(lat, dtype='float64') + 90) / 180 * (1 << lat_bits)).astype('int64'),
+                 0, (1 << lat_bits) - 1)
+
+    # Interleave the bits, longitude first, most significant bit first
+    code = np.zeros(len(ix), dtype='int64')
+    for k in range(5 * precision):
+        if k % 2 == 0:
+            bit = (ix >> (lon_bits - 1 - k // 2)) & 1
+        else:
+            bit = (iy >> (lat_bits - 1 - k // 2)) & 1
+        code = (code << 1) | bit
+    return code, ix, iy
+
+
+def geohash_strings(codes, precision):
+    """Base-32 geohash strings of integer geohash codes."""
+    return [
+        ''.join(GEOHASH_ALPHABET[(int(code) >> (5 * (precision - 1 - i))) & 31] for i in range(precision))
+        for code in codes
+    ]
+
+
+class GeoGrid:
+    """
+    Count, total mass and fell/found per geohash cell at several precisions.
+
+    Built from plain arrays, so it works for any point data set; memory per
+    level grows with the number of occupied cells, not with the points.
+    """
+
+    def __init__(self, lat, lon, mass=None, fell=None, precisions=PRECISIONS):
+        lat = np.asarray(lat, dtype='float64')
+        lon = np.asarray(lon, dtype='float64')
+        mass = np.zeros(len(lat)) if mass is None else np.nan_to_num(np.asarray(mass, dtype='float64'))
+        fell = np.zeros(len(lat), dtype=bool) if fell is None else np.asarray(fell, dtype=bool)
+
+        # The points are binned once, at the finest precision. A coarser cell is
+        # a geohash prefix, so coarser levels are rolled up from the finer cells.
+        finest = max(precisions)
+        code, ix, iy = geohash_codes(lat, lon, finest)
+        cells, cell = np.unique(code, return_inverse=True)
+        first = np.zeros(len(cells), dtype='int64')
+        first[cell[::-1]] = np.arange(len(cell))[::-1]
+        fine = {
+            'code': cells,
+            'ix': ix[first],
+            'iy': iy[first],
+            'count': np.bincount(cell, minlength=len(cells)),
+            'mass': np.bincount(cell, weights=mass, minlength=len(cells)),
+            'fell': np.bincount(cell, weights=fell, minlength=len(cells)).astype('int64'),
+        }
+
+        self.levels = {}
+        fine_lon_bits, fine_lat_bits = _grid_bits(finest)
+        for precision in sorted(precisions):
+            lon_bits, lat_bits = _grid_bits(precision)
+            parents, parent = np.unique(fine['code'] >> (5 * (finest - precision)), return_inverse=True)
+            first = np.zeros(len(parents), dtype='int64')
+            first[parent[::-1]] = np.arange(len(parent))[::-1]
+            level = {
+                'code': parents,
+                'ix': fine['ix'][first] >> (fine_lon_bits - lon_bits),
+                'iy': fine['iy'][first] >> (fine_lat_bits - lat_bits),
+                'count': np.bincount(parent, weights=fine['count'], minlength=len(parents)).astype('int64'),
+                'mass': np.bincount(parent, weights=fine['mass'], minlength=len(parents)),
+                'fell': np.bincount(parent, weights=fine['fell'], minlength=len(parents)).astype('int64'),
+            }
+
+            # Sorted by grid column (then row) for bounding-box queries
+            order = np.lexsort((level['iy'], level['ix']))
+            self.levels[precision] = {key: values[order] for key, values in level.items()}
+
+    @classmethod
+    def from_frame(cls, df, precisions=PRECISIONS):
+        """Grid for a frame of landings as returned by load_landings()."""
+        return cls(df['reclat'], df['reclong'], df['mass (g)'], df['fall'] == 'Fell', precisions)
+
+    @staticmethod
+    def cell_size(precision):
+        """(width, height) of a cell in degrees."""
+        lon_bits, lat_bits = _grid_bits(precision)
+        return 360 / (1 << lon_bits), 180 / (1 << lat_bits)
+
+    def precision_for(self, bbox, max_cells=MAX_VIEW_CELLS):
+        """Finest precision whose grid covers bbox with at most max_cells cells (the zoom level)."""
+        lon_min, lat_min, lon_max, lat_max = bbox
+        best = min(self.levels)
+        for precision in sorted(self.levels):
+            width, height = self.cell_size(precision)
+            n_cells = (np.ceil((lon_max - lon_min) / width) + 1) * (np.ceil((lat_max - lat_min) / height) + 1)
+            if n_cells <= max_cells:
+                best = precision
+        return best
+
+    def query(self, bbox=WORLD, precision=None):
+        """
+        The occupied cells intersecting bbox (lon_min, lat_min, lon_max,
+        lat_max) as a frame with the geohash, cell centre and bounds, count,
+        total mass, fell, found and fell_ratio. The precision defaults to
+        the finest one that fits the view (precision_for). A box with
+        lon_min > lon_max crosses the antimeridian (e.g. 170 to -170).
+        """
+        lon_min, lat_min, lon_max, lat_max = bbox
+        if lon_min > lon_max:
+            # The box crosses the antimeridian: query both sides at the same precision
+            precision = precision or self.precision_for((lon_min, lat_min, lon_max + 360, lat_max))
+            return pd.concat([self.query((lon_min, lat_min, 180.0, lat_max), precision),
+                              self.query((-180.0, lat_min, lon_max, lat_max), precision)], ignore_index=True)
+
+        precision = precision or self.precision_for(bbox)
+        level = self.levels[precision]
+        width, height = self.cell_size(precision)
+
+        ix_low, ix_high = int((lon_min + 180) // width), int((lon_max + 180) // width)
+        iy_low, iy_high = int((lat_min + 90) // height), int((lat_max + 90) // height)
+        start = np.searchsorted(level['ix'], ix_low, side='left')
+        stop = np.searchsorted(level['ix'], ix_high, side='right')
+        iy = level['iy'][start:stop]
+        visible = np.arange(start, stop)[(iy >= iy_low) & (iy <= iy_high)]
+
+        ix, iy = level['ix'][visible], level['iy'][visible]
+        count, fell = level['count'][visible], level['fell'][visible]
+        return pd.DataFrame({
+            'geohash': geohash_strings(level['code'][visible], precision),
+            'lat': -90 + (iy + 0.5) * height,
+            'lon': -180 + (ix + 0.5) * width,
+            'lat_min': -90 + iy * height,
+            'lon_min': -180 + ix * width,
+            'lat_max': -90 + (iy + 1) * height,
+            'lon_max': -180 + (ix + 1) * width,
+            'count': count,
+            'mass_g': level['mass'][visible],
+            'fell': fell,
+            'found': count - fell,
+            'fell_ratio': fell / count,
+        }).assign(precision=precision)
+
+
+def grid_map_figure(cells, title='Meteorite Landings by Geohash Cell'):
+    """
+    One marker per cell at its centre: size by landing count (log scale),
+    colour by the share of observed falls. Hover shows count, mass and fell/found.
+    """
+    import plotly.graph_objects as go
+
+    size = 4 + 4 * np.log10(cells['count'].to_numpy())
+    fig = go.Figure(go.Scattergeo(
+        lon=cells['lon'],
+        lat=cells['lat'],
+        mode='markers',
+        marker=dict(size=size, color=cells['fell_ratio'], colorscale='Viridis', cmin=0, cmax=1,
+                    colorbar=dict(title='Fell Ratio'), line=dict(width=0)),
+        customdata=np.column_stack([cells['geohash'], cells['count'], cells['mass_g'] / 1000,
+                                    cells['fell'], cells['found']]),
+        hovertemplate='Cell %{customdata[0]}<br>Landings: %{customdata[1]}<br>'
+                      'Total mass: %{customdata[2]:,.1f} kg<br>'
+                      'Fell / found: %{customdata[3]} / %{customdata[4]}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=title,
+        height=550,
+        geo=dict(showland=True, landcolor='#e5e5e5', showcountries=True, projection_type='natural earth')
+    )
+    return fig
+
+
+if __name__ == '__main__':
+    landings = load_landings(sys.argv[1] if len(sys.argv) > 1 else DATA_FILE)
+    grid = GeoGrid.from_frame(landings)
+    for precision, level in grid.levels.items():
+        width, height = grid.cell_size(precision)
+        print(f"precision {precision}: {len(level['code']):>6,} cells of {width:.3g} x {height:.3g} degrees")
+    grid_map_figure(grid.query(precision=3)).write_html('meteorite_grid.html')
+    print("Map written to meteorite_grid.html")
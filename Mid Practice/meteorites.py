@@ -0,0 +1,161 @@
+"""
+Typed loader and rollups for Meteorite_Landings.csv.
+
+The CSV is parsed once into a compact Parquet cache (.cache/ next to the
+CSV), rebuilt only when the CSV changes. The GeoLocation column is skipped,
+since reclat/reclong hold the same coordinates.
+
+    from meteorites import read_meteorites, read_rollups, decade_counts
+    df = read_meteorites()          # float32 coordinates, Int16 year, categorical classes
+    rollups = read_rollups()        # year x class, year x fall, year x mass bucket
+    decade_counts(rollups, 1900, 2000).plot.bar()
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+DATA_FILE = 'Meteorite_Landings.csv'
+CACHE_DIRECTORY = '.cache'
+CACHE_FORMAT = 1
+
+COLUMN_DTYPES = {
+    'name': 'string',
+    'id': 'int32',
+    'nametype': 'category',
+    'recclass': 'category',
+    'mass (g)': 'float32',
+    'fall': 'category',
+    'reclat': 'float32',
+    'reclong': 'float32',
+}
+
+# Years outside this range are data entry errors (e.g. 2101) and become missing
+YEAR_RANGE = (800, 2025)
+
+# Mass buckets used by the notebooks
+MASS_BINS = [0, 1000, 50000, 1000000, np.inf]
+MASS_LABELS = ['Small', 'Medium', 'Large', 'Massive']
+
+ROLLUPS = {
+    'year_class': ['year', 'recclass'],
+    'year_fall': ['year', 'fall'],
+    'year_mass': ['year', 'mass_bucket'],
+}
+
+
+def cache_paths(csv_path):
+    """Returns {name: path} of the cached data, rollups and metadata for a CSV."""
+    folder = os.path.join(os.path.dirname(csv_path) or '.', CACHE_DIRECTORY)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    paths = {name: os.path.join(folder, f"{stem}.{name}.parquet") for name in ['data', *ROLLUPS]}
+    paths['meta'] = os.path.join(folder, f"{stem}.meta.json")
+    return paths
+
+
+def parse_meteorites(csv_path=DATA_FILE):
+    """Parses the CSV into the typed frame (no cache)."""
+    df = pd.read_csv(csv_path, usecols=[*COLUMN_DTYPES, 'year'], dtype=COLUMN_DTYPES)
+    year = pd.to_numeric(df['year'], errors='coerce')
+    df['year'] = year.where(year.between(*YEAR_RANGE)).astype('Int16')
+    df['mass_bucket'] = pd.cut(df['mass (g)'], MASS_BINS, labels=MASS_LABELS)
+    return df
+
+
+def build_rollups(df):
+    """
+    Landing count and total mass per (year, recclass), (year, fall) and
+    (year, mass_bucket). Rows with a missing year or key are kept as their
+    own group, so every rollup sums to the full data set.
+    """
+    return {
+        name: (df.groupby(keys, observed=True, dropna=False)
+               .agg(count=('id', 'size'), mass_g=('mass (g)', 'sum'))
+               .reset_index())
+        for name, keys in ROLLUPS.items()
+    }
+
+
+def _cache_is_fresh(csv_path, paths):
+    try:
+        with open(paths['meta']) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    stat = os.stat(csv_path)
+    return (meta.get('format') == CACHE_FORMAT and meta.get('mtime_ns') == stat.st_mtime_ns
+            and meta.get('size') == stat.st_size
+            and all(os.path.exists(paths[name]) for name in ['data', *ROLLUPS]))
+
+
+def build_cache(csv_path=DATA_FILE):
+    """Parses the CSV and writes the typed data and its rollups to the cache."""
+    paths = cache_paths(csv_path)
+    os.makedirs(os.path.dirname(paths['meta']), exist_ok=True)
+    df = parse_meteorites(csv_path)
+    for name, frame in {'data': df, **build_rollups(df)}.items():
+        frame.to_parquet(paths[name] + '.tmp', engine='pyarrow', index=False)
+        os.replace(paths[name] + '.tmp', paths[name])
+
+    stat = os.stat(csv_path)
+    with open(paths['meta'], 'w') as f:
+        json.dump({'format': CACHE_FORMAT, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}, f, indent=2)
+    return df
+
+
+def read_meteorites(csv_path=DATA_FILE):
+    """Returns the typed landings frame, parsing the CSV only when the cache is stale."""
+    paths = cache_paths(csv_path)
+    if _cache_is_fresh(csv_path, paths):
+        return pd.read_parquet(paths['data'], engine='pyarrow')
+    return build_cache(csv_path)
+
+
+def read_rollups(csv_path=DATA_FILE):
+    """Returns {'year_class', 'year_fall', 'year_mass': frame} from the cache."""
+    paths = cache_paths(csv_path)
+    if not _cache_is_fresh(csv_path, paths):
+        build_cache(csv_path)
+    return {name: pd.read_parquet(paths[name], engine='pyarrow') for name in ROLLUPS}
+
+
+def has_location(df):
+    """Mask of the rows with usable coordinates (not missing, not (0, 0), within range)."""
+    return (
+        df['reclat'].between(-90, 90) & df['reclong'].between(-180, 180)
+        & ~((df['reclat'] == 0) & (df['reclong'] == 0))
+    )
+
+
+# Chart series served from the rollups
+
+def decade_counts(rollups, start=None, end=None):
+    """Landings per decade (index: decade start year), optionally for years in [start, end)."""
+    by_year = rollups['year_fall'].dropna(subset=['year']).groupby('year')['count'].sum()
+    if start is not None:
+        by_year = by_year[by_year.index >= start]
+    if end is not None:
+        by_year = by_year[by_year.index < end]
+    return by_year.groupby((by_year.index.astype('int64') // 10) * 10).sum().rename_axis('decade')
+
+
+def class_counts(rollups, top=None):
+    """Landings per recclass, most common first."""
+    counts = rollups['year_class'].groupby('recclass', observed=True)['count'].sum()
+    counts = counts.sort_values(ascending=False)
+    return counts.head(top) if top else counts
+
+
+def mass_bucket_counts(rollups):
+    """Landings per mass bucket, in bucket order (missing or zero mass is left out)."""
+    counts = rollups['year_mass'].groupby('mass_bucket', observed=False)['count'].sum()
+    return counts.reindex(MASS_LABELS, fill_value=0)
+
+
+def fall_counts_by_year(rollups):
+    """Frame of Fell / Found landings per year (columns are the fall categories)."""
+    return (rollups['year_fall'].dropna(subset=['year'])
+            .pivot_table(index='year', columns='fall', values='count', aggfunc='sum', fill_value=0,
+                         observed=True))
@@ -0,0 +1,229 @@
+"""
+Browserless QR backends for the QR batch scripts.
+
+Instead of driving the React form in Chrome, the PNG of each member ID is
+either fetched from the generator's endpoint ("http") or drawn locally
+("local"). Files are saved as qr-<id>.png, like the browser scripts do.
+
+- http: one requests.Session with a keep-alive connection pool shared by
+  the worker threads. QR_API_URL is the endpoint with a {member_id}
+  placeholder (copy it from the browser's network tab). The response may be
+  the PNG itself, or JSON/text holding a data:image/png;base64 URL.
+- local: drawn with the qrcode package (pip install qrcode[pil]). Whether
+  the PNGs are byte-identical to the site's depends on its settings; tune
+  LOCAL_QR_OPTIONS to match.
+
+    QR_BACKEND=http QR_API_URL="https://.../qr?memberId={member_id}" python bye.py
+    python qr_http.py 25P0046 25P0047 --backend local --output qr_codes
+    python qr_http.py --ids-file member_ids.csv --output qr_codes   # resumable, see qr_manifest.py
+    python qr_http.py --benchmark 200      # mock server: HTTP backend vs Selenium, IDs/s
+"""
+import argparse
+import base64
+import importlib.util
+import io
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from qr_manifest import MANIFEST_NAME, PNG_SIGNATURE, Manifest, output_path, pending_ids, read_member_ids
+from qr_pool import PoolStats, backoff_delay, log_summary
+
+# --- Configuration ---
+API_URL = os.environ.get("QR_API_URL", "")
+HTTP_WORKERS = 16
+REQUEST_TIMEOUT = 30
+BACKENDS = ('http', 'local')
+
+# Options for qrcode.QRCode used by the local backend
+LOCAL_QR_OPTIONS = dict(box_size=10, border=4)
+LOCAL_BACKEND_MISSING = "the local backend needs the qrcode package: pip install qrcode[pil]"
+
+DATA_URL_PATTERN = re.compile(r'data:image/png;base64,([A-Za-z0-9+/=]+)')
+
+
+def make_session(pool_size=HTTP_WORKERS):
+    """requests session keeping up to pool_size connections alive, retrying connection errors and 5xx."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=Retry(
+        total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=['GET']))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def png_from_response(response):
+    """The PNG bytes in a response: the body itself, or a base64 data URL inside JSON or text."""
+    if response.content.startswith(PNG_SIGNATURE):
+        return response.content
+    match = DATA_URL_PATTERN.search(response.text)
+    if match is None:
+        raise ValueError(f"no PNG in the response ({response.headers.get('Content-Type', 'unknown type')})")
+    data = base64.b64decode(match.group(1))
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("the data URL in the response is not a PNG")
+    return data
+
+
+def fetch_qr_png(session, member_id, api_url=API_URL):
+    """PNG of member_id from the generator endpoint."""
+    response = session.get(api_url.format(member_id=quote(member_id)), timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return png_from_response(response)
+
+
+def local_qr_png(member_id):
+    """PNG of a QR code encoding member_id, drawn locally."""
+    try:
+        import qrcode
+    except ImportError:
+        raise RuntimeError(LOCAL_BACKEND_MISSING) from None
+    qr = qrcode.QRCode(**LOCAL_QR_OPTIONS)
+    qr.add_data(member_id)
+    buffer = io.BytesIO()
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
+
+def save_png(directory, member_id, data):
+    """Writes qr-<member_id>.png in directory (atomically) and returns its path."""
+    path = output_path(directory, member_id)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def download_all(member_ids, directory, backend='http', api_url=API_URL, workers=HTTP_WORKERS,
+                 max_attempts=3, timings_file=None, manifest=None, log=print):
+    """
+    Saves the QR PNG of every member ID in directory with `workers` threads
+    and returns the PoolStats (same report as the browser pool). A failed ID
+    is retried after an exponential backoff, up to max_attempts tries; the
+    outcome of every ID is logged to manifest, if given. The time recorded
+    for an ID covers all its attempts, backoff included.
+    """
+    if max_attempts < 1:
+        raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown QR backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == 'http' and '{member_id}' not in api_url:
+        raise ValueError("the http backend needs QR_API_URL with a {member_id} placeholder")
+    if backend == 'local' and importlib.util.find_spec('qrcode') is None:
+        raise RuntimeError(LOCAL_BACKEND_MISSING)
+    os.makedirs(directory, exist_ok=True)
+    session = make_session(workers) if backend == 'http' else None
+    stats = PoolStats(total=len(member_ids))
+    worker_numbers = {}
+
+    def process(member_id):
+        started = time.perf_counter()
+        for attempt in range(1, max_attempts + 1):
+            try:
+                data = fetch_qr_png(session, member_id, api_url) if backend == 'http' else local_qr_png(member_id)
+                save_png(directory, member_id, data)
+                break
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt < max_attempts:
+                    time.sleep(backoff_delay(attempt))
+        else:
+            with stats.lock:
+                stats.failed[member_id] = error
+            if manifest is not None:
+                manifest.record(member_id, 'failed', max_attempts, error=error)
+            return
+
+        seconds = time.perf_counter() - started
+        with stats.lock:
+            number = worker_numbers.setdefault(threading.get_ident(), len(worker_numbers) + 1)
+            stats.succeeded.append(member_id)
+            stats.timings[member_id] = seconds
+            stats.per_worker[number] = stats.per_worker.get(number, 0) + 1
+        if manifest is not None:
+            manifest.record(member_id, 'ok', attempt, seconds)
+
+    log(f"Processing {stats.total} member IDs with the {backend} backend ({workers} thread(s))...")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(process, member_ids))
+    finally:
+        if session is not None:
+            session.close()
+    log_summary(stats, timings_file, log)
+    return stats
+
+
+def benchmark(n_ids=200, delay_ms=100, workers=4, http_workers=HTTP_WORKERS):
+    """
+    IDs per second of the HTTP backend and of the Selenium pool (bye.py)
+    against the local stand-in (qr_standin.py), both with the same simulated
+    generation delay. The Selenium run is skipped when selenium is not installed.
+    """
+    from qr_standin import serve
+
+    server, url = serve(port=0)
+    member_ids = [f"BENCH{i:05d}" for i in range(n_ids)]
+    quiet = lambda message: None
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            api_url = url + f"api/qr?memberId={{member_id}}&delay={delay_ms}"
+            stats = download_all(member_ids, directory, 'http', api_url, workers=http_workers, log=quiet)
+            results['http'] = stats.rate()
+
+        try:
+            import bye
+        except ImportError as e:
+            print(f"Selenium path skipped: {e}")
+        else:
+            with tempfile.TemporaryDirectory() as directory:
+                bye.DOWNLOAD_DIRECTORY = directory
+                stats = bye.run_pool(member_ids, bye.setup_driver, bye.process_member_id, f"{url}?delay={delay_ms}",
+                                     workers=workers, log=quiet)
+                results['selenium'] = stats.rate()
+    finally:
+        server.shutdown()
+
+    for name, rate in results.items():
+        print(f"{name:<9} {rate:8.2f} IDs/s")
+    if len(results) == 2:
+        print(f"http is {results['http'] / results['selenium']:.1f}x faster")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save QR code PNGs for member IDs without a browser.")
+    parser.add_argument('member_ids', nargs='*', help="member IDs to process")
+    parser.add_argument('--ids-file', help="CSV or text file of member IDs (resumes via the manifest)")
+    parser.add_argument('--backend', choices=BACKENDS, default='http')
+    parser.add_argument('--output', default='.', help="folder for the qr-<id>.png files")
+    parser.add_argument('--api-url', default=API_URL, help="endpoint with a {member_id} placeholder")
+    parser.add_argument('--workers', type=int, default=HTTP_WORKERS)
+    parser.add_argument('--benchmark', type=int, metavar='N', help="benchmark N IDs against the local mock server")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+    if not args.member_ids and not args.ids_file:
+        parser.error("give member IDs, --ids-file or --benchmark N")
+    member_ids = read_member_ids(args.ids_file) if args.ids_file else args.member_ids
+    os.makedirs(args.output, exist_ok=True)
+    with Manifest(os.path.join(args.output, MANIFEST_NAME)) as manifest:
+        member_ids = pending_ids(member_ids, args.output, manifest)
+        stats = download_all(member_ids, args.output, args.backend, args.api_url, args.workers, manifest=manifest)
+    return 1 if stats.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Resumable batch runs for the QR scripts.
+
+Member IDs are streamed from a text file (one per line, # comments allowed)
+or a CSV (a member ID / student ID / ID column, else the first column). A run
+appends one JSON line per finished ID to a manifest next to the QR files:
+
+    {"member_id": "25P0046", "status": "ok", "attempts": 1, "latency_s": 0.84, "error": null, "updated": "..."}
+
+The last line of an ID wins, and attempts add up across runs. On restart,
+pending_ids() skips every ID whose qr-<id>.png already exists and is a
+complete PNG, so only the missing and previously failed IDs are processed.
+
+    python bye.py member_ids.csv
+"""
+import csv
+import json
+import os
+import re
+import threading
+import time
+
+# --- Configuration ---
+MANIFEST_NAME = 'qr_manifest.jsonl'
+ID_COLUMNS = ('member_id', 'student_id', 'id')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _column_key(name):
+    """Header name compared case-insensitively, ignoring spaces, underscores and dashes."""
+    return re.sub(r'[\s_-]+', '', name).lower()
+
+
+def read_member_ids(path):
+    """
+    Yields the member IDs in a .csv or text file, in order and without
+    duplicates. A CSV uses its member ID column (see ID_COLUMNS; matched
+    ignoring case, spaces and underscores), else its first column; a header
+    row without a known name is detected with csv.Sniffer and skipped.
+    """
+    seen = set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if path.lower().endswith('.csv'):
+            sample = f.read(64 * 1024)
+            f.seek(0)
+            reader = csv.reader(f)
+            header = next(reader, [])
+            id_keys = {_column_key(name) for name in ID_COLUMNS}
+            column = next((i for i, name in enumerate(header) if _column_key(name) in id_keys), None)
+            if column is None:
+                column = 0
+                try:
+                    has_header = csv.Sniffer().has_header(sample)
+                except csv.Error:
+                    has_header = False
+                # Without a header the first row already holds an ID
+                rows = [] if has_header else [header]
+            else:
+                rows = []
+            values = (row[column] for source in (rows, reader) for row in source if len(row) > column)
+        else:
+            values = (line.split('#', 1)[0] for line in f)
+
+        for value in values:
+            member_id = value.strip()
+            if member_id and member_id not in seen:
+                seen.add(member_id)
+                yield member_id
+
+
+def is_valid_png(path):
+    """True if path is a complete PNG (signature at the start, IEND chunk at the end)."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(8) != PNG_SIGNATURE:
+                return False
+            f.seek(-12, os.SEEK_END)
+            return f.read(12)[4:8] == b'IEND'
+    except OSError:
+        return False
+
+
+def output_path(directory, member_id):
+    """Path of the QR file of member_id in directory: qr-<member_id>.png."""
+    return os.path.join(directory, f"qr-{member_id}.png")
+
+
+class Manifest:
+    """Append-only JSON lines log of per-ID results; safe to share between worker threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+        n_lines = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.records[record['member_id']] = record
+                    n_lines += 1
+        if n_lines > 2 * len(self.records) + 100:
+            self._compact()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _compact(self):
+        """Rewrites the manifest with only the latest line per ID."""
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            for record in self.records.values():
+                f.write(json.dumps(record) + '\n')
+        os.replace(self.path + '.tmp', self.path)
+
+    def status(self, member_id):
+        record = self.records.get(member_id)
+        return record['status'] if record else None
+
+    def record(self, member_id, status, attempts=1, latency_s=None, error=None):
+        """Logs the outcome of member_id after `attempts` tries in this run."""
+        with self._lock:
+            previous = self.records.get(member_id, {})
+            record = {
+                'member_id': member_id,
+                'status': status,
+                'attempts': previous.get('attempts', 0) + attempts,
+                'latency_s': round(latency_s, 3) if latency_s is not None else None,
+                'error': error,
+                'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            self.records[member_id] = record
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pending_ids(member_ids, directory, manifest=None, log=print):
+    """
+    The member IDs still to process: those without a valid qr-<id>.png in
+    directory. IDs found done are marked ok in the manifest if it did not know yet.
+    """
+    pending, n_done, n_failed_before = [], 0, 0
+    for member_id in member_ids:
+        if is_valid_png(output_path(directory, member_id)):
+            n_done += 1
+            if manifest is not None and manifest.status(member_id) != 'ok':
+                manifest.record(member_id, 'ok', attempts=0)
+            continue
+        if manifest is not None and manifest.status(member_id) == 'failed':
+            n_failed_before += 1
+        pending.append(member_id)
+    log(f"{n_done} ID(s) already done, {len(pending)} to process ({n_failed_before} failed before)")
+    return pending
@@ -0,0 +1,191 @@
+"""
+Bounded pool of headless browser workers for the QR batch scripts.
+
+hi.py and bye.py each provide setup_driver(headless=...) and
+process_member_id(driver, member_id, log=...). run_pool() starts up to
+`workers` drivers, hands out member IDs from a shared queue and prints an
+aggregated progress report while they run.
+
+A failed ID goes to the back of the queue and is retried (on any worker)
+after an exponential backoff, up to max_attempts tries. If the browser itself is gone
+(the recovery refresh fails too), the worker quits it and starts a new one,
+up to max_restarts times before the worker stops; the other workers carry on.
+"""
+import csv
+import queue
+import random
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PoolStats:
+    """Progress of a pool run, shared by all workers (guarded by lock)."""
+    total: int
+    started: float = field(default_factory=time.perf_counter)
+    succeeded: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+    restarts: int = 0
+    per_worker: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def done(self):
+        return len(self.succeeded) + len(self.failed)
+
+    def rate(self):
+        """Finished IDs per second since the start."""
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def report(self, workers_alive):
+        rate = self.rate()
+        remaining = self.total - self.done
+        eta = f"{remaining / rate / 60:.1f} min" if rate > 0 else "-"
+        return (f"[{self.done:>{len(str(self.total))}}/{self.total}] {len(self.succeeded)} ok, "
+                f"{len(self.failed)} failed | {rate:.2f} IDs/s | ETA {eta} | "
+                f"{workers_alive} worker(s) alive, {self.restarts} restart(s)")
+
+
+def timing_summary(timings):
+    """One-line summary of per-ID seconds: count, median, p95 and mean."""
+    if not timings:
+        return "no timings recorded"
+    seconds = sorted(timings.values())
+    p95 = statistics.quantiles(seconds, n=20)[18] if len(seconds) > 1 else seconds[0]
+    return (f"{len(seconds)} ID(s): median {statistics.median(seconds):.2f} s, "
+            f"p95 {p95:.2f} s, mean {statistics.fmean(seconds):.2f} s per ID")
+
+
+def write_timings(path, timings):
+    """Writes {member_id: seconds} to a CSV (member_id, seconds) for comparing runs."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['member_id', 'seconds'])
+        for member_id, seconds in timings.items():
+            writer.writerow([member_id, f"{seconds:.3f}"])
+
+
+def log_summary(stats, timings_file=None, log=print):
+    """Logs the end-of-run summary of a PoolStats and writes its timings if timings_file is given."""
+    elapsed = time.perf_counter() - stats.started
+    log(f"\nFinished {stats.done}/{stats.total} IDs in {elapsed:.1f} s ({stats.rate():.2f} IDs/s): "
+        f"{len(stats.succeeded)} ok, {len(stats.failed)} failed, {stats.restarts} browser restart(s)")
+    log(f"  latency: {timing_summary(stats.timings)}")
+    for number, count in sorted(stats.per_worker.items()):
+        log(f"  worker {number}: {count} ID(s)")
+    for member_id, error in stats.failed.items():
+        log(f"  FAILED {member_id}: {error}")
+    if timings_file:
+        write_timings(timings_file, stats.timings)
+        log(f"  per-ID timings written to {timings_file}")
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Seconds to wait before retrying after `attempt` failed tries: doubling from base, capped, jittered."""
+    return min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+def _recover(driver):
+    """Refreshes the page after a failure; returns None if the browser no longer responds."""
+    try:
+        driver.refresh()
+        return driver
+    except Exception:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return None
+
+
+def run_pool(member_ids, setup_driver, process_member_id, start_url, workers=4,
+             max_attempts=2, max_restarts=3, report_interval=5.0, timings_file=None, manifest=None,
+             log=print):
+    """
+    Processes member_ids with up to `workers` headless drivers in parallel
+    and returns the PoolStats. IDs still queued when every worker has stopped
+    are reported as failed. The seconds each successful ID took are kept in
+    stats.timings and, if timings_file is given, written to it as CSV. The
+    outcome of every ID is also logged to manifest (a qr_manifest.Manifest), if given.
+    """
+    pending = queue.Queue()
+    for member_id in member_ids:
+        pending.put((member_id, 1, 0.0))
+    stats = PoolStats(total=len(member_ids))
+    driver_lock = threading.Lock()  # drivers are started one at a time (driver downloads are not thread-safe)
+    alive = []
+
+    def worker(number):
+        driver, restarts = None, 0
+        try:
+            while True:
+                try:
+                    member_id, attempt, not_before = pending.get_nowait()
+                except queue.Empty:
+                    return
+                # A retried ID waits out its backoff (usually over already, after the rest of the queue)
+                time.sleep(max(0.0, not_before - time.monotonic()))
+                try:
+                    if driver is None:
+                        with driver_lock:
+                            driver = setup_driver(headless=True)
+                        driver.get(start_url)
+                    started = time.perf_counter()
+                    process_member_id(driver, member_id, log=lambda message: None)
+                    seconds = time.perf_counter() - started
+                    with stats.lock:
+                        stats.succeeded.append(member_id)
+                        stats.timings[member_id] = seconds
+                        stats.per_worker[number] = stats.per_worker.get(number, 0) + 1
+                    if manifest is not None:
+                        manifest.record(member_id, 'ok', attempt, seconds)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}".strip()
+                    if attempt < max_attempts:
+                        pending.put((member_id, attempt + 1, time.monotonic() + backoff_delay(attempt)))
+                    else:
+                        with stats.lock:
+                            stats.failed[member_id] = error
+                        if manifest is not None:
+                            manifest.record(member_id, 'failed', attempt, error=error)
+                        log(f"  - worker {number}: {member_id} failed after {attempt} attempt(s): {e}")
+                    driver = _recover(driver) if driver is not None else None
+                    if driver is None:
+                        restarts += 1
+                        with stats.lock:
+                            stats.restarts += 1
+                        if restarts > max_restarts:
+                            log(f"  - worker {number}: browser crashed {restarts} times, stopping this worker")
+                            return
+        finally:
+            if driver is not None:
+                driver.quit()
+            alive.remove(number)
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(1, workers + 1)]
+    alive.extend(range(1, workers + 1))
+    log(f"Processing {stats.total} member IDs with {workers} headless browser(s)...")
+    for thread in threads:
+        thread.start()
+
+    last_report = time.perf_counter()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(0.2)
+        if time.perf_counter() - last_report >= report_interval:
+            last_report = time.perf_counter()
+            with stats.lock:
+                log(stats.report(len(alive)))
+
+    # Anything left in the queue was never processed because every worker stopped
+    while not pending.empty():
+        member_id, attempt, _ = pending.get_nowait()
+        stats.failed[member_id] = "not processed: all workers stopped"
+        if manifest is not None:
+            manifest.record(member_id, 'failed', attempt - 1, error=stats.failed[member_id])
+
+    log_summary(stats, timings_file, log)
+    return stats
@@ -0,0 +1,162 @@
+"""
+Local stand-in for the QR generator page, for trying the QR scripts offline.
+
+It mimics the parts of the real form the scripts rely on: the memberId input,
+the submit button, the placeholder text, the "Generated QR Code" card with a
+data:image/png;base64 image and the "Download QR Code" button, which saves
+qr-<id>.png. The image is a pattern derived from the ID, not a real QR code.
+
+It also serves /api/qr?memberId=<id>, which returns such a pattern as a PNG
+directly: the mock endpoint for the browserless backend in qr_http.py.
+
+    python qr_standin.py                                  # serves http://127.0.0.1:8765/
+    QR_WEBSITE_URL=http://127.0.0.1:8765/ python bye.py
+    QR_BACKEND=http QR_API_URL="http://127.0.0.1:8765/api/qr?memberId={member_id}" python bye.py
+
+?delay=<ms> in either URL sets how long "generating" takes (default 300 ms
+for the page, 0 for the API).
+"""
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# --- Configuration ---
+HOST = '127.0.0.1'
+PORT = 8765
+
+PAGE = """<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>QR Generator (stand-in)</title></head>
+<body>
+  <form id="form">
+    <input name="memberId" placeholder="Member ID" autocomplete="off">
+    <button type="submit">Generate QR Code</button>
+  </form>
+  <p id="placeholder">Enter Member ID to generate QR code</p>
+  <div id="card" class="rounded-xl" style="display: none">
+    <div>Generated QR Code</div>
+    <img id="qr" alt="QR code">
+    <button type="button" id="download">Download QR Code</button>
+  </div>
+  <script>
+    const delay = Number(new URLSearchParams(location.search).get('delay') || 300);
+    const form = document.getElementById('form');
+    const card = document.getElementById('card');
+    const img = document.getElementById('qr');
+    let memberId = '';
+
+    // 25 x 25 modules seeded by the ID, drawn at 10 px per module
+    function drawPattern(text) {
+      const canvas = document.createElement('canvas');
+      canvas.width = canvas.height = 250;
+      const ctx = canvas.getContext('2d');
+      ctx.fillStyle = '#fff';
+      ctx.fillRect(0, 0, 250, 250);
+      ctx.fillStyle = '#000';
+      let seed = 0;
+      for (const ch of text) seed = (seed * 31 + ch.charCodeAt(0)) >>> 0;
+      for (let i = 0; i < 625; i++) {
+        seed = (seed * 1103515245 + 12345) >>> 0;
+        if (seed & 0x10000) ctx.fillRect((i % 25) * 10, Math.floor(i / 25) * 10, 10, 10);
+      }
+      return canvas.toDataURL('image/png');
+    }
+
+    form.addEventListener('submit', (event) => {
+      event.preventDefault();
+      memberId = form.memberId.value.trim();
+      if (!memberId) return;
+      // Like the real page, the card is re-rendered and the image is filled in later
+      card.style.display = 'none';
+      img.removeAttribute('src');
+      document.getElementById('placeholder').style.display = 'none';
+      setTimeout(() => {
+        card.style.display = '';
+        img.src = drawPattern(memberId);
+      }, delay);
+    });
+
+    document.getElementById('download').addEventListener('click', () => {
+      const link = document.createElement('a');
+      link.href = img.src;
+      link.download = `qr-${memberId}.png`;
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+    });
+  </script>
+</body>
+</html>
+"""
+
+
+def pattern_png(member_id, modules=25, scale=10):
+    """Black and white PNG of a modules x modules pattern seeded by member_id (not a QR code)."""
+    seed = 0
+    for ch in member_id:
+        seed = (seed * 31 + ord(ch)) & 0xFFFFFFFF
+    dark = []
+    for _ in range(modules * modules):
+        seed = (seed * 1103515245 + 12345) & 0xFFFFFFFF
+        dark.append(bool(seed & 0x10000))
+
+    size = modules * scale
+    rows = []
+    for y in range(modules):
+        row = b''.join((b'\x00' if dark[y * modules + x] else b'\xff') * scale for x in range(modules))
+        rows.extend([b'\x00' + row] * scale)  # filter type 0 per scanline
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', size, size, 8, 0, 0, 0, 0)  # 8-bit greyscale
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(b''.join(rows))) + chunk(b'IEND', b''))
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive, like the real server
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/api/qr':
+            member_id = query.get('memberId', [''])[0].strip()
+            if not member_id:
+                self._send(400, 'text/plain', b'memberId is required')
+                return
+            time.sleep(int(query.get('delay', ['0'])[0]) / 1000)
+            self._send(200, 'image/png', pattern_png(member_id))
+        else:
+            self._send(200, 'text/html; charset=utf-8', PAGE.encode())
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=HOST, port=PORT):
+    """Starts the stand-in in a background thread; returns (server, url). Port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+if __name__ == '__main__':
+    server, url = serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else PORT)
+    print(f"QR generator stand-in running at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
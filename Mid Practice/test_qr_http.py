@@ -0,0 +1,32 @@
+"""
+Tests for the browserless QR backends in qr_http.py, against the mock endpoint of qr_standin.py.
+
+    python -m pytest test_qr_http.py
+"""
+import pytest
+
+from qr_http import download_all
+from qr_standin import pattern_png, serve
+
+
+def test_http_backend_saves_pngs(tmp_path):
+    server, url = serve(port=0)
+    try:
+        stats = download_all(['25P0046', '25P0047'], str(tmp_path), 'http', url + 'api/qr?memberId={member_id}',
+                             workers=2, log=lambda message: None)
+    finally:
+        server.shutdown()
+    assert sorted(stats.succeeded) == ['25P0046', '25P0047']
+    assert (tmp_path / 'qr-25P0046.png').read_bytes() == pattern_png('25P0046')
+
+
+@pytest.mark.parametrize('backend', ['htp', 'Browser', 'browser'])
+def test_unknown_backend_is_rejected(tmp_path, backend):
+    with pytest.raises(ValueError, match="unknown QR backend"):
+        download_all(['25P0046'], str(tmp_path), backend, log=lambda message: None)
+
+
+@pytest.mark.parametrize('max_attempts', [0, -1])
+def test_max_attempts_below_one_is_rejected(tmp_path, max_attempts):
+    with pytest.raises(ValueError, match="max_attempts"):
+        download_all(['25P0046'], str(tmp_path), 'local', max_attempts=max_attempts, log=lambda message: None)
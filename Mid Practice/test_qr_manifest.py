@@ -0,0 +1,44 @@
+"""
+Tests for the resumable QR batch helpers in qr_manifest.py.
+
+    python -m pytest test_qr_manifest.py
+"""
+import pytest
+
+from qr_manifest import Manifest, pending_ids, read_member_ids
+from qr_standin import pattern_png
+
+
+@pytest.mark.parametrize('text', [
+    'Student ID,Name\n25P0046,a\n25P0047,b\n',
+    'ID\n25P0046\n25P0047\n',
+    'Name,member-id\nx,25P0046\ny,25P0047\n',
+    'Name,Dept\n25P0046,CSE\n25P0047,EEE\n',
+    '25P0046\n25P0047\n25P0046\n',
+])
+def test_read_member_ids_from_csv(tmp_path, text):
+    path = tmp_path / 'ids.csv'
+    path.write_text(text)
+    assert list(read_member_ids(str(path))) == ['25P0046', '25P0047']
+
+
+def test_read_member_ids_from_text(tmp_path):
+    path = tmp_path / 'ids.txt'
+    path.write_text('# orientation\n25P0046\n\n25P0047  # late\n')
+    assert list(read_member_ids(str(path))) == ['25P0046', '25P0047']
+
+
+def test_rerun_skips_valid_outputs_and_keeps_attempts(tmp_path):
+    (tmp_path / 'qr-done.png').write_bytes(pattern_png('done'))
+    (tmp_path / 'qr-cut.png').write_bytes(pattern_png('cut')[:100])
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+
+    with Manifest(manifest_path) as manifest:
+        manifest.record('failed', 'failed', attempts=3, error="TimeoutException")
+        assert pending_ids(['done', 'cut', 'failed', 'new'], str(tmp_path), manifest,
+                           log=lambda message: None) == ['cut', 'failed', 'new']
+
+    with Manifest(manifest_path) as manifest:
+        assert manifest.status('done') == 'ok'
+        manifest.record('failed', 'ok', attempts=1, latency_s=0.5)
+        assert manifest.records['failed']['attempts'] == 4
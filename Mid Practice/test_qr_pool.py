@@ -0,0 +1,135 @@
+"""
+Tests for the QR browser pool (qr_pool.run_pool) with fake drivers, and for
+bye.process_member_id against the local stand-in page (needs selenium and Chrome).
+
+    python -m pytest test_qr_pool.py
+"""
+import pytest
+
+import qr_pool
+from qr_manifest import PNG_SIGNATURE
+from qr_pool import run_pool
+from qr_standin import serve
+
+
+class FakeDriver:
+    """Stands in for a WebDriver; a crashed one no longer refreshes."""
+
+    def __init__(self):
+        self.crashed = False
+        self.quit_called = False
+
+    def get(self, url):
+        pass
+
+    def refresh(self):
+        if self.crashed:
+            raise RuntimeError("browser is gone")
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(qr_pool, 'backoff_delay', lambda attempt: 0.0)
+
+
+def start_pool(member_ids, process, **kwargs):
+    drivers = []
+
+    def setup_driver(headless=False):
+        assert headless
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    stats = run_pool(member_ids, setup_driver, process, 'http://stand-in/', log=lambda message: None, **kwargs)
+    return stats, drivers
+
+
+def test_flaky_id_succeeds_on_retry():
+    calls = {}
+
+    def process(driver, member_id, log=print):
+        calls[member_id] = calls.get(member_id, 0) + 1
+        if member_id == 'flaky' and calls[member_id] < 2:
+            raise RuntimeError("button not found")
+
+    stats, drivers = start_pool(['a', 'flaky', 'b'], process, workers=2, max_attempts=2)
+    assert sorted(stats.succeeded) == ['a', 'b', 'flaky']
+    assert stats.failed == {}
+    assert calls['flaky'] == 2
+    assert set(stats.timings) == {'a', 'b', 'flaky'}
+    assert all(driver.quit_called for driver in drivers)
+
+
+def test_id_that_always_fails_is_reported():
+    calls = {}
+
+    def process(driver, member_id, log=print):
+        calls[member_id] = calls.get(member_id, 0) + 1
+        if member_id == 'bad':
+            raise RuntimeError("no QR code")
+
+    stats, _ = start_pool(['a', 'bad', 'b'], process, workers=2, max_attempts=3)
+    assert sorted(stats.succeeded) == ['a', 'b']
+    assert stats.failed == {'bad': "RuntimeError: no QR code"}
+    assert calls['bad'] == 3
+    assert stats.restarts == 0
+
+
+def test_crashed_browser_is_restarted():
+    crashes = []
+
+    def process(driver, member_id, log=print):
+        if member_id == 'crash' and not crashes:
+            crashes.append(member_id)
+            driver.crashed = True
+            raise RuntimeError("session deleted")
+
+    stats, drivers = start_pool(['a', 'crash', 'b', 'c'], process, workers=1, max_attempts=2)
+    assert sorted(stats.succeeded) == ['a', 'b', 'c', 'crash']
+    assert stats.restarts == 1
+    assert len(drivers) == 2
+    assert drivers[0].crashed and drivers[0].quit_called
+
+
+def test_worker_stops_after_max_restarts():
+    def process(driver, member_id, log=print):
+        driver.crashed = True
+        raise RuntimeError("session deleted")
+
+    stats, drivers = start_pool([f"id{i}" for i in range(5)], process, workers=1, max_attempts=1, max_restarts=2)
+    assert stats.succeeded == []
+    assert stats.restarts == 3
+    assert len(drivers) == 3
+    # The worker gave up after its third crash: the last two IDs were never tried
+    assert len(stats.failed) == 5
+    assert sum(error.startswith("not processed") for error in stats.failed.values()) == 2
+
+
+def test_bye_process_member_id_against_stand_in(tmp_path, monkeypatch):
+    pytest.importorskip('selenium')
+    pytest.importorskip('webdriver_manager')
+    import bye
+
+    monkeypatch.setattr(bye, 'DOWNLOAD_DIRECTORY', str(tmp_path))
+    server, url = serve(port=0)
+    try:
+        try:
+            driver = bye.setup_driver(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chrome is not available: {e}")
+        try:
+            driver.get(url + '?delay=50')
+            for member_id in ['25P0046', '25P0047']:
+                bye.process_member_id(driver, member_id, log=lambda message: None)
+        finally:
+            driver.quit()
+    finally:
+        server.shutdown()
+
+    # The page draws its pattern on a canvas, so the files are PNGs, one per ID
+    images = [(tmp_path / f"qr-{member_id}.png").read_bytes() for member_id in ['25P0046', '25P0047']]
+    assert all(image.startswith(PNG_SIGNATURE) for image in images)
+    assert images[0] != images[1]
@@ -0,0 +1,377 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Age buckets used by the treemap (same edges as the original pd.cut call)
+AGE_BINS = [16, 20, 25, 30, 35, 50]
+AGE_LABELS = ['16-20', '21-25', '26-30', '31-35', '36+']
+
+# Categorical columns whose per-category counts the panels show
+COUNT_COLUMNS = {
+    'foot_counts': 'preferred_foot',
+    'nationality_counts': 'nationality_name',
+    'league_counts': 'league_name',
+    'work_rate_counts': 'work_rate',
+    'body_type_counts': 'body_type',
+    'country_counts': 'nationality_iso3',
+}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Every number the KPI rows and count panels need, computed once per dataset version."""
+    total_players: int
+    avg_value: float
+    avg_wage: float
+    max_value: float
+    max_wage: float
+    top_value_player: str
+    top_wage_player: str
+    foot_counts: pd.Series
+    club_value: pd.Series
+    age_counts: pd.Series
+    nationality_counts: pd.Series
+    league_counts: pd.Series
+    work_rate_counts: pd.Series
+    body_type_counts: pd.Series
+    country_counts: pd.Series
+
+
+def category_counts(series):
+    """
+    value_counts() for a categorical column done with a single bincount over
+    the category codes. Categories that never occur are dropped.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    return counts_series(counts, series.cat.categories)
+
+
+def counts_series(counts, categories):
+    """Turns per-category counts into a value_counts()-style Series (no zeros, largest first)."""
+    result = pd.Series(counts, index=categories, name='count')
+    return result[result > 0].sort_values(ascending=False, kind='stable')
+
+
+def category_sums(series, weights):
+    """groupby(series)[weights].sum() done with a weighted bincount (NaN weights count as 0)."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    codes = series.cat.codes.to_numpy()
+    values = np.nan_to_num(weights.to_numpy(dtype='float64'))
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=len(series.cat.categories))
+    return pd.Series(sums, index=series.cat.categories, name=weights.name)
+
+
+def age_group_counts(age, weights=None):
+    """Number of players per age bucket, in bucket order (weights count players per age value)."""
+    groups = pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS)
+    if weights is None:
+        return groups.value_counts(sort=False)
+    return pd.Series(weights, dtype='int64').groupby(np.asarray(groups), observed=False).sum() \
+        .reindex(AGE_LABELS, fill_value=0).rename_axis(None).rename('count')
+
+
+def histogram_bins(values, nbins=30, weights=None):
+    """
+    Bins a numeric column on the server and returns (counts, edges), so a
+    chart only has to draw nbins bars instead of receiving every row.
+    Integer columns such as ratings get integer-aligned bins of equal width.
+    weights, if given, are the number of players behind each value.
+    """
+    values = np.asarray(values, dtype='float64')
+    keep = ~np.isnan(values)
+    if weights is not None:
+        weights = np.asarray(weights)
+        keep &= weights > 0
+        weights = weights[keep]
+    values = values[keep]
+    if values.size == 0:
+        return np.zeros(0, dtype='int64'), np.zeros(1)
+
+    lo, hi = values.min(), values.max()
+    if np.all(values == np.floor(values)):
+        width = max(1, int(np.ceil((hi - lo + 1) / nbins)))
+        n_edges = int(np.ceil((hi - lo + 1) / width)) + 1
+        edges = lo - 0.5 + width * np.arange(n_edges)
+    else:
+        edges = np.histogram_bin_edges(values, bins=nbins)
+    counts, edges = np.histogram(values, bins=edges, weights=weights)
+    return counts.astype('int64'), edges
+
+
+def _column_stats(values):
+    """Returns (mean, max, argmax) of a float array, ignoring NaN."""
+    if np.isnan(values).all():
+        return 0.0, 0.0, None
+    return float(np.nanmean(values)), float(np.nanmax(values)), int(np.nanargmax(values))
+
+
+def build_snapshot(df):
+    """Computes the aggregate snapshot for a players frame in one vectorized pass per column."""
+    value = df['value_eur'].to_numpy(dtype='float64')
+    wage = df['wage_eur'].to_numpy(dtype='float64')
+    avg_value, max_value, top_value_pos = _column_stats(value)
+    avg_wage, max_wage, top_wage_pos = _column_stats(wage)
+
+    names = df['short_name']
+    club_value = category_sums(df['club_name'], df['value_eur'])
+
+    return Snapshot(
+        total_players=len(df),
+        avg_value=avg_value,
+        avg_wage=avg_wage,
+        max_value=max_value,
+        max_wage=max_wage,
+        top_value_player=names.iat[top_value_pos] if top_value_pos is not None else '-',
+        top_wage_player=names.iat[top_wage_pos] if top_wage_pos is not None else '-',
+        club_value=club_value.sort_values(ascending=False).head(100),
+        # age_group is precomputed at ingestion; frames without it are bucketed here
+        age_counts=(df['age_group'].value_counts(sort=False) if 'age_group' in df.columns
+                    else age_group_counts(df['age'])),
+        **{key: category_counts(df[column]) for key, column in COUNT_COLUMNS.items()},
+    )
+
+
+def _cell_partials(cell, n_cells, df):
+    """Per-cell partial aggregates that can be summed (or maxed) over any set of cells."""
+    value = df['value_eur'].to_numpy(dtype='float64')
+    wage = df['wage_eur'].to_numpy(dtype='float64')
+    partials = {
+        'count': np.bincount(cell, minlength=n_cells),
+        'value_sum': np.bincount(cell, weights=np.nan_to_num(value), minlength=n_cells),
+        'value_n': np.bincount(cell, weights=~np.isnan(value), minlength=n_cells),
+        'wage_sum': np.bincount(cell, weights=np.nan_to_num(wage), minlength=n_cells),
+        'wage_n': np.bincount(cell, weights=~np.isnan(wage), minlength=n_cells),
+    }
+
+    # Largest value/wage per cell and the (first) row holding it
+    for name, values in (('value', value), ('wage', wage)):
+        filled = np.where(np.isnan(values), -np.inf, values)
+        order = np.lexsort((-filled, cell))
+        first = np.searchsorted(cell[order], np.arange(n_cells))
+        partials[f'{name}_top_row'] = order[first]
+        partials[f'{name}_max'] = filled[order[first]]
+
+    # Sparse (cell, category) -> count tables; club_value sums value_eur instead
+    sparse = {}
+    for key, column in COUNT_COLUMNS.items():
+        sparse[key] = _sparse_table(cell, n_cells, df[column])
+    sparse['club_value'] = _sparse_table(cell, n_cells, df['club_name'], weights=np.nan_to_num(value))
+    potential = df['potential'].to_numpy(dtype='float64')
+    sparse['potential'] = _sparse_table(cell, n_cells, pd.Series(pd.Categorical(potential)))
+    partials['sparse'] = sparse
+    return partials
+
+
+def _sparse_table(cell, n_cells, series, weights=None):
+    """Returns (cells, codes, totals, categories) for every non-empty (cell, category) pair."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    codes = series.cat.codes.to_numpy().astype('int64')
+    n_categories = max(len(series.cat.categories), 1)
+    valid = codes >= 0
+    pairs = cell[valid] * n_categories + codes[valid]
+    keys, inverse = np.unique(pairs, return_inverse=True)
+    totals = np.bincount(inverse, weights=None if weights is None else weights[valid])
+    return keys // n_categories, keys % n_categories, totals, series.cat.categories
+
+
+class AggregateCube:
+    """
+    Partial aggregates for cross-filtering every panel.
+
+    Players are grouped into cells by (set of positions, overall, age), the
+    three dimensions the sidebar filters on. Each cell keeps counts, sums and
+    maxima, so the aggregates for any filter are the combination of the cells
+    it selects; no per-filter groupby over the rows is needed. A second,
+    much smaller rollup over (overall, age) answers filters without positions.
+    """
+
+    def __init__(self, df, max_cached=128):
+        self.names = df['short_name']
+        self.club_names = df['club_name']
+
+        overall = df['overall'].to_numpy(dtype='int64')
+        age = df['age'].to_numpy(dtype='int64')
+        self._overall_min, self._age_min = overall.min(), age.min()
+        n_overall = overall.max() - self._overall_min + 1
+        n_age = age.max() - self._age_min + 1
+        base = (overall - self._overall_min) * n_age + (age - self._age_min)
+
+        # Distinct position sets, e.g. {'CB', 'LB'} for "CB, LB" and "LB, CB".
+        # Only the few hundred distinct strings are normalized; rows follow their codes.
+        codes, uniques = pd.factorize(df['player_positions'])
+        normalized = [','.join(sorted(p.strip() for p in str(text).split(',') if p.strip())) for text in uniques]
+        unique_combo, combo_labels = pd.factorize(pd.Series(normalized + ['']))  # '' is for missing (code -1)
+        combo = unique_combo[codes]
+        self.combo_positions = [frozenset(label.split(',')) - {''} for label in combo_labels]
+
+        self._levels = {}
+        for level, keys in (('rollup', base), ('positions', combo * (n_overall * n_age) + base)):
+            cells, cell = np.unique(keys, return_inverse=True)
+            rest = cells % (n_overall * n_age)
+            self._levels[level] = {
+                'combo': cells // (n_overall * n_age),
+                'overall': rest // n_age + self._overall_min,
+                'age': rest % n_age + self._age_min,
+                **_cell_partials(cell, len(cells), df),
+            }
+
+        self.max_cached = max_cached
+        self.query = lru_cache(maxsize=max_cached)(self._query)
+
+    def __getstate__(self):
+        # Pickled (for precomputed bundles) without the query cache
+        state = self.__dict__.copy()
+        del state['query']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.query = lru_cache(maxsize=self.max_cached)(self._query)
+
+    def _selected_cells(self, positions, ranges):
+        level = self._levels['positions' if positions else 'rollup']
+        selected = np.ones(len(level['count']), dtype=bool)
+        if positions:
+            wanted = set(positions)
+            combo_selected = np.array([bool(p & wanted) for p in self.combo_positions])
+            selected &= combo_selected[level['combo']]
+        for column, low, high in ranges:
+            selected &= (level[column] >= low) & (level[column] <= high)
+        return level, selected
+
+    def _query(self, filter_key):
+        """
+        Snapshot plus overall/potential histogram counts for a filter key as
+        produced by FilterEngine.normalize(). Cached, so call with that key.
+        """
+        positions, ranges = filter_key
+        level, selected = self._selected_cells(positions, ranges)
+
+        def total(name):
+            return float(level[name][selected].sum())
+
+        def top(name):
+            maxima = level[f'{name}_max'][selected]
+            if maxima.size == 0 or not np.isfinite(maxima.max()):
+                return 0.0, '-'
+            best = maxima.max()
+            row = level[f'{name}_top_row'][selected][maxima == best].min()
+            return float(best), self.names.iat[row]
+
+        def sparse_totals(key):
+            cells, codes, totals, categories = level['sparse'][key]
+            keep = selected[cells]
+            return np.bincount(codes[keep], weights=totals[keep], minlength=len(categories)), categories
+
+        max_value, top_value_player = top('value')
+        max_wage, top_wage_player = top('wage')
+        club_sums, clubs = sparse_totals('club_value')
+        counts = {}
+        for key in COUNT_COLUMNS:
+            key_counts, categories = sparse_totals(key)
+            counts[key] = counts_series(key_counts.astype('int64'), categories)
+
+        value_n, wage_n = total('value_n'), total('wage_n')
+        snapshot = Snapshot(
+            total_players=int(total('count')),
+            avg_value=total('value_sum') / value_n if value_n else 0.0,
+            avg_wage=total('wage_sum') / wage_n if wage_n else 0.0,
+            max_value=max_value,
+            max_wage=max_wage,
+            top_value_player=top_value_player,
+            top_wage_player=top_wage_player,
+            club_value=pd.Series(club_sums, index=clubs, name='value_eur')
+                .sort_values(ascending=False).head(100),
+            age_counts=age_group_counts(level['age'][selected], weights=level['count'][selected]),
+            **counts,
+        )
+
+        potential_counts, potential_values = sparse_totals('potential')
+        histograms = {
+            'overall': (level['overall'][selected], level['count'][selected]),
+            'potential': (np.asarray(potential_values, dtype='float64'), potential_counts),
+        }
+        return snapshot, histograms
+
+
+class StreamingAggregator:
+    """
+    Builds the same Snapshot and histogram inputs as AggregateCube.query()
+    from a stream of chunks, so data sets far larger than memory can be
+    summarized. Only running totals are kept; peak memory is one chunk.
+    """
+
+    def __init__(self):
+        self.total_players = 0
+        self.sums = {'value': 0.0, 'wage': 0.0}
+        self.non_null = {'value': 0, 'wage': 0}
+        self.top = {'value': (-np.inf, '-'), 'wage': (-np.inf, '-')}
+        self.counts = {key: pd.Series(dtype='int64') for key in COUNT_COLUMNS}
+        self.club_value = pd.Series(dtype='float64')
+        self.value_counts = {column: pd.Series(dtype='int64') for column in ('age', 'overall', 'potential')}
+
+    @staticmethod
+    def _add(total, part):
+        return total.add(part, fill_value=0)
+
+    def update(self, chunk):
+        """Folds one chunk of player rows into the running totals."""
+        self.total_players += len(chunk)
+
+        for name in ('value', 'wage'):
+            values = chunk[f'{name}_eur']
+            self.sums[name] += float(values.sum())
+            self.non_null[name] += int(values.count())
+            if values.count():
+                best = values.idxmax()
+                # Strictly greater keeps the first occurrence, like idxmax() on the full frame
+                if values[best] > self.top[name][0]:
+                    self.top[name] = (float(values[best]), chunk.at[best, 'short_name'])
+
+        for key, column in COUNT_COLUMNS.items():
+            self.counts[key] = self._add(self.counts[key], chunk[column].value_counts())
+        self.club_value = self._add(
+            self.club_value, chunk.groupby('club_name', observed=True)['value_eur'].sum()
+        )
+        for column in self.value_counts:
+            self.value_counts[column] = self._add(self.value_counts[column], chunk[column].value_counts())
+
+    def result(self):
+        """Returns (Snapshot, histograms) for everything seen so far."""
+        def average(name):
+            return self.sums[name] / self.non_null[name] if self.non_null[name] else 0.0
+
+        def top(name):
+            best, player = self.top[name]
+            return (float(best), player) if np.isfinite(best) else (0.0, '-')
+
+        max_value, top_value_player = top('value')
+        max_wage, top_wage_player = top('wage')
+        ages = self.value_counts['age']
+        snapshot = Snapshot(
+            total_players=self.total_players,
+            avg_value=average('value'),
+            avg_wage=average('wage'),
+            max_value=max_value,
+            max_wage=max_wage,
+            top_value_player=top_value_player,
+            top_wage_player=top_wage_player,
+            club_value=self.club_value.sort_values(ascending=False).head(100).rename('value_eur'),
+            age_counts=age_group_counts(ages.index.to_numpy(), weights=ages.to_numpy()),
+            **{key: counts_series(counts.astype('int64').to_numpy(), counts.index)
+               for key, counts in self.counts.items()},
+        )
+        histograms = {
+            column: (self.value_counts[column].index.to_numpy(dtype='float64'),
+                     self.value_counts[column].to_numpy(dtype='int64'))
+            for column in ('overall', 'potential')
+        }
+        return snapshot, histograms
@@ -1,8 +1,23 @@
+import glob
+import os
+import time
+
+# Start of this script run, the zero point of the profiling spans and of time-to-first-metric
+RUN_STARTED = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from aggregates import AggregateCube, StreamingAggregator, build_snapshot, histogram_bins
+from data_store import (discover_seasons, iter_player_chunks, open_shared_players, season_version,
+                        sources_version)
+from figures import DASHBOARD_CHARTS, FigureCache, value_scatter_figure
+from filters import SORT_COLUMNS, FilterEngine, build_position_index
+from precompute import load_bundle, read_manifest
+from profiling import Profiler, SpanHistory
+from scatter import SCATTER_POINT_BUDGET, SCATTER_X_COLUMNS, ScatterIndex, color_groups
+from similarity import SimilarityIndex
 
 # Set page configuration
 st.set_page_config(
@@ -36,61 +51,233 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Load data
+# Streaming mode: set PLAYERS_STREAM to a glob of player CSV/Parquet files
+# (e.g. "data/players_*.csv") to summarize them chunk by chunk without ever
+# loading a full frame. Row-level features (filters, table) are unavailable.
+STREAM_PATTERN = os.environ.get('PLAYERS_STREAM')
+STREAM_CHUNK_SIZE = int(os.environ.get('PLAYERS_STREAM_CHUNK_SIZE', 250_000))
+
+# Season partitions found under data/ are loaded only when selected, and at
+# most this many seasons (with their indexes) are kept in memory at once
+MAX_SEASONS_IN_MEMORY = int(os.environ.get('MAX_SEASONS_IN_MEMORY', 3))
+
+# Precomputed mode: set DASHBOARD_BUNDLE to a directory written by
+# precompute.py to load every artifact from it instead of parsing the CSV
+BUNDLE_DIRECTORY = os.environ.get('DASHBOARD_BUNDLE')
+
+# Fast-start mode: DASHBOARD_FAST_START=1 renders the KPI rows and top charts
+# first and builds the sections below them only when picked under "More Sections"
+FAST_START = os.environ.get('DASHBOARD_FAST_START') == '1'
+
+# Profiling: every section is timed. DASHBOARD_DEBUG=1 (or ?debug=1 in the URL)
+# shows the breakdown in the sidebar; DASHBOARD_SPANS_LOG=<path> appends every
+# span to that file as JSON lines for the log pipeline.
+DEBUG_PANEL = os.environ.get('DASHBOARD_DEBUG') == '1' or st.query_params.get('debug') == '1'
+SPANS_LOG = os.environ.get('DASHBOARD_SPANS_LOG')
+
+# Sessions only ever read the shared players frame; with copy-on-write an
+# accidental in-place change copies the column instead of altering it for everyone
+pd.set_option('mode.copy_on_write', True)
+
+# Load data: one read-only frame per dataset version, backed by a memory-mapped
+# Arrow file and shared by all sessions (st.cache_data would copy it per caller)
+@st.cache_resource(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_data(path, version):
+    return open_shared_players(path, version)
+
+# Aggregates for the KPI rows and count panels, computed once per dataset version
+@st.cache_data(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_snapshot(version, _df):
+    return build_snapshot(_df)
+
+# Position -> row numbers index for the sidebar position filter, built once per dataset version
+@st.cache_resource(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_position_index(version, _df):
+    return build_position_index(_df['player_positions'])
+
+# Filter engine (sorted slider columns + LRU result cache), shared by all sessions
+@st.cache_resource(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_filter_engine(version, _df):
+    return FilterEngine(_df, load_position_index(version, _df))
+
+# Per-cell partial aggregates used to answer any sidebar filter for every panel
+@st.cache_resource(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_aggregate_cube(version, _df):
+    return AggregateCube(_df)
+
+# Normalized attribute matrix for the similar-players search, built once per dataset version
+@st.cache_resource(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_similarity_index(version, _df):
+    return SimilarityIndex(_df)
+
+# Sorted rating columns and sampling priorities for the value scatter, built once per dataset version
+@st.cache_resource(max_entries=MAX_SEASONS_IN_MEMORY)
+def load_scatter_index(version, _df):
+    return ScatterIndex(_df)
+
+# Aggregates for the streaming mode, computed in one pass over all files
 @st.cache_data
-def load_data():
-    df = pd.read_csv('players_22_cleaned.csv')
-    return df
+def load_streamed_aggregates(version, paths, chunksize):
+    aggregator = StreamingAggregator()
+    for chunk in iter_player_chunks(paths, chunksize=chunksize):
+        aggregator.update(chunk)
+    return aggregator.result()
+
+# Finished figures keyed by dataset version, chart id and parameters, shared by all sessions
+@st.cache_resource
+def load_figure_cache():
+    return FigureCache()
+
+# Artifacts of a precomputed bundle; its figures go straight into the figure cache
+@st.cache_resource
+def load_bundle_artifacts(directory, version):
+    bundle = load_bundle(directory)
+    for chart_id, params, fig in bundle['figures']:
+        load_figure_cache().put(version, chart_id, params, fig)
+    return bundle
+
+# Rolling span durations shared by all sessions (and the JSON-lines export)
+@st.cache_resource
+def load_span_history(export_path):
+    return SpanHistory(export_path=export_path)
+
+profiler = Profiler(load_span_history(SPANS_LOG), st.session_state.setdefault('session_id', os.urandom(6).hex()),
+                    started=RUN_STARTED)
+
+def run_profiler():
+    """
+    The Profiler for the code running now. A fragment rerun does not execute
+    the script again, so the module-level profiler still belongs to the last
+    full run; fragment reruns get a Profiler of their own instead.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        return Profiler(load_span_history(SPANS_LOG), st.session_state['session_id'])
+    return profiler
 
 # Load the data
-df = load_data()
+figure_cache = load_figure_cache()
+if STREAM_PATTERN:
+    stream_paths = tuple(sorted(glob.glob(STREAM_PATTERN)))
+    if not stream_paths:
+        st.error(f"No player files match PLAYERS_STREAM={STREAM_PATTERN!r}")
+        st.stop()
+    df = None
+    data_version = sources_version(stream_paths)
+    with profiler.span('load.stream'):
+        snapshot, stream_histograms = load_streamed_aggregates(data_version, stream_paths, STREAM_CHUNK_SIZE)
+elif BUNDLE_DIRECTORY:
+    with profiler.span('load.bundle'):
+        data_version = read_manifest(BUNDLE_DIRECTORY)['version']
+        bundle = load_bundle_artifacts(BUNDLE_DIRECTORY, data_version)
+    df, snapshot, season = bundle['df'], bundle['snapshot'], bundle['manifest']['season']
+    position_index, filter_engine = bundle['position_index'], bundle['filter_engine']
+    aggregate_cube, similarity_index = bundle['aggregate_cube'], bundle['similarity_index']
+    scatter_index = bundle['scatter_index']
+else:
+    # Season selector (only when data/ holds season partitions)
+    seasons = discover_seasons()
+    if seasons:
+        season = st.sidebar.selectbox(
+            "Season",
+            options=list(seasons),
+            index=len(seasons) - 1,
+            format_func=lambda s: f"FIFA {s}",
+            # A filter applied to one season does not carry over to another
+            on_change=lambda: st.session_state.pop('active_filter', None)
+        )
+        data_path = seasons[season]
+    else:
+        season, data_path = '22', 'players_22_cleaned.csv'
+
+    with profiler.span('load.data'):
+        data_version = season_version(data_path)
+        df = load_data(data_path, data_version)
+    with profiler.span('load.snapshot'):
+        snapshot = load_snapshot(data_version, df)
+    with profiler.span('load.indexes'):
+        position_index = load_position_index(data_version, df)
+        filter_engine = load_filter_engine(data_version, df)
+        similarity_index = load_similarity_index(data_version, df)
+        scatter_index = load_scatter_index(data_version, df)
+    with profiler.span('load.cube'):
+        aggregate_cube = load_aggregate_cube(data_version, df)
+
+# Filter applied with the sidebar button (None shows every player).
+# All panels below are drawn from `view`, the aggregates for that filter.
+active_filter = None if df is None else st.session_state.get('active_filter')
+if df is None:
+    view, histograms = snapshot, stream_histograms
+elif active_filter is None:
+    view, histograms = snapshot, None
+else:
+    with profiler.span('filter.view'):
+        view, histograms = aggregate_cube.query(active_filter)
+
+def histogram_for(column, nbins):
+    """(counts, edges) of a rating column for the active filter."""
+    if histograms is None:
+        return histogram_bins(df[column].to_numpy(), nbins)
+    values, weights = histograms[column]
+    return histogram_bins(values, nbins, weights=weights)
+
+def show_chart(chart_id):
+    """Emits a chart from the figure cache (built on a miss), timing the build and the emit."""
+    params, build = DASHBOARD_CHARTS[chart_id]
+    with profiler.span(f'chart.{chart_id}.build'):
+        fig = figure_cache.get_or_build(data_version, chart_id, {'filter': active_filter, **params},
+                                        lambda: build(view, histogram_for))
+    with profiler.span(f'chart.{chart_id}.emit'):
+        st.plotly_chart(fig, use_container_width=True)
 
 # Title
-st.markdown("<h1>⚽ FIFA 22 Players Analysis</h1>", unsafe_allow_html=True)
+page_title = "FIFA Players Analysis" if df is None else f"FIFA {season} Players Analysis"
+st.markdown(f"<h1>⚽ {page_title}</h1>", unsafe_allow_html=True)
+if active_filter is not None:
+    st.caption(f"Showing {view.total_players:,} of {snapshot.total_players:,} players matching the sidebar filters")
 
 # Top metrics row
 col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    avg_value = df['value_eur'].mean() / 1_000_000
+with col1, profiler.span('metric.avg_value'):
+    avg_value = view.avg_value / 1_000_000
     st.metric("Average Value", f"{avg_value:.2f}M €")
+profiler.mark('first_metric')
 
-with col2:
-    avg_wage = df['wage_eur'].mean() / 1_000
+with col2, profiler.span('metric.avg_wage'):
+    avg_wage = view.avg_wage / 1_000
     st.metric("Average Wage", f"{avg_wage:.2f}K €")
 
-with col3:
+with col3, profiler.span('metric.top_value'):
     # Top player by value
-    top_player_value = df.loc[df['value_eur'].idxmax()]
-    st.metric("Top Player By Value", top_player_value['short_name'])
-    st.caption(f"Value: {top_player_value['value_eur']/1_000_000:.0f}M €")
+    st.metric("Top Player By Value", view.top_value_player)
+    st.caption(f"Value: {view.max_value/1_000_000:.0f}M €")
 
-with col4:
+with col4, profiler.span('metric.top_wage'):
     # Top player by wage
-    top_player_wage = df.loc[df['wage_eur'].idxmax()]
-    st.metric("Top Player By Wage", top_player_wage['short_name'])
-    st.caption(f"Wage: {top_player_wage['wage_eur']/1_000:.0f}K €")
+    st.metric("Top Player By Wage", view.top_wage_player)
+    st.caption(f"Wage: {view.max_wage/1_000:.0f}K €")
 
 st.markdown("---")
 
 # Second metrics row
 col5, col6, col7, col8 = st.columns(4)
 
-with col5:
-    max_value = df['value_eur'].max() / 1_000_000
+with col5, profiler.span('metric.max_value'):
+    max_value = view.max_value / 1_000_000
     st.metric("Max Value", f"{max_value:.0f}M €")
 
-with col6:
-    max_wage = df['wage_eur'].max() / 1_000
+with col6, profiler.span('metric.max_wage'):
+    max_wage = view.max_wage / 1_000
     st.metric("Max Wage", f"{max_wage:.0f}K €")
 
-with col7:
+with col7, profiler.span('metric.right_foot'):
     # Players by preferred foot
-    right_foot = len(df[df['preferred_foot'] == 'Right'])
+    right_foot = int(view.foot_counts.get('Right', 0))
     st.metric("Right Footed Players", f"{right_foot:,}")
 
-with col8:
-    left_foot = len(df[df['preferred_foot'] == 'Left'])
+with col8, profiler.span('metric.left_foot'):
+    left_foot = int(view.foot_counts.get('Left', 0))
     st.metric("Left Footed Players", f"{left_foot:,}")
 
 st.markdown("---")
@@ -101,30 +288,7 @@ row1_col1, row1_col2 = st.columns([1, 2])
 # Top 100 Clubs by Value
 with row1_col1:
     st.subheader("Top 100 Clubs by Value")
-    club_value = df.groupby('club_name')['value_eur'].sum().sort_values(ascending=False).head(100)
-    club_value_df = pd.DataFrame({
-        'Club': club_value.index,
-        'Value': club_value.values / 1_000_000_000  # Convert to billions
-    })
-    
-    fig_clubs = px.bar(
-        club_value_df.head(20),
-        y='Club',
-        x='Value',
-        orientation='h',
-        title='Top 20 Clubs by Total Value',
-        labels={'Value': 'Value (Billions €)', 'Club': ''},
-        color='Value',
-        color_continuous_scale='Viridis'
-    )
-    fig_clubs.update_layout(
-        height=600,
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
-    )
-    st.plotly_chart(fig_clubs, use_container_width=True)
+    show_chart('clubs')
 
 # Player Distribution by Overall Rating and Potential
 with row1_col2:
@@ -132,252 +296,281 @@ with row1_col2:
     
     with col_hist1:
         st.subheader("Player Distribution by Overall Rating")
-        fig_overall = px.histogram(
-            df,
-            x='overall',
-            nbins=30,
-            title='Overall Rating Distribution',
-            labels={'overall': 'Overall Rating', 'count': 'Number of Players'},
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_overall.update_layout(
-            height=300,
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white')
-        )
-        st.plotly_chart(fig_overall, use_container_width=True)
-    
+        show_chart('overall')
+
     with col_hist2:
         st.subheader("Player Distribution by Potential")
-        fig_potential = px.histogram(
-            df,
-            x='potential',
-            nbins=30,
-            title='Potential Rating Distribution',
-            labels={'potential': 'Potential (POT)', 'count': 'Number of Players'},
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_potential.update_layout(
-            height=300,
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white')
-        )
-        st.plotly_chart(fig_potential, use_container_width=True)
-    
+        show_chart('potential')
+
     # Players by Preferred Foot
     st.subheader("Players by Preferred Foot")
-    foot_counts = df['preferred_foot'].value_counts()
-    fig_foot = px.bar(
-        x=foot_counts.index,
-        y=foot_counts.values,
-        title='Distribution by Preferred Foot',
-        labels={'x': 'Preferred Foot', 'y': 'Number of Players'},
-        color=foot_counts.index,
-        color_discrete_map={'Right': '#1f77b4', 'Left': '#ff9800'}
-    )
-    fig_foot.update_layout(
-        height=300,
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
-    )
-    st.plotly_chart(fig_foot, use_container_width=True)
+    show_chart('foot')
 
 st.markdown("---")
 
 # Row 2: Age Distribution and Nationality Map
-row2_col1, row2_col2 = st.columns(2)
-
-with row2_col1:
-    st.subheader("Players Distribution by Age")
-    # Create age groups
-    df['age_group'] = pd.cut(df['age'], bins=[16, 20, 25, 30, 35, 50], 
-                              labels=['16-20', '21-25', '26-30', '31-35', '36+'])
-    age_counts = df.groupby('age_group').size().reset_index(name='count')
-    
-    fig_age = px.treemap(
-        age_counts,
-        path=['age_group'],
-        values='count',
-        title='Players by Age Groups',
-        color='count',
-        color_continuous_scale='RdYlGn'
-    )
-    fig_age.update_layout(
-        height=500,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
-    )
-    fig_age.update_traces(textinfo="label+value+percent parent")
-    st.plotly_chart(fig_age, use_container_width=True)
+def age_nationality_section():
+    row2_col1, row2_col2 = st.columns(2)
 
-with row2_col2:
-    st.subheader("Players Distribution by Nationality")
-    nationality_counts = df['nationality_name'].value_counts().reset_index()
-    nationality_counts.columns = ['country', 'count']
-    
-    # Map country names to ISO codes for plotly
-    fig_map = px.choropleth(
-        nationality_counts.head(50),
-        locations='country',
-        locationmode='country names',
-        color='count',
-        hover_name='country',
-        hover_data={'count': True},
-        title='Top 50 Countries by Player Count',
-        color_continuous_scale='Blues',
-        labels={'count': 'Number of Players'}
-    )
-    fig_map.update_layout(
-        height=500,
-        geo=dict(
-            showframe=False,
-            showcoastlines=True,
-            projection_type='natural earth',
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
-    )
-    st.plotly_chart(fig_map, use_container_width=True)
+    with row2_col1:
+        st.subheader("Players Distribution by Age")
+        show_chart('age')
 
-st.markdown("---")
+    with row2_col2:
+        st.subheader("Players Distribution by Nationality")
+        show_chart('map')
+        unmapped = int(view.nationality_counts.sum() - view.country_counts.sum())
+        if unmapped:
+            st.caption(f"{unmapped:,} players have a nationality without a country code and are not on the map.")
 
 # Additional Statistics Section
-st.header("📊 Additional Statistics")
-
-col_stat1, col_stat2, col_stat3 = st.columns(3)
-
-with col_stat1:
-    st.subheader("Top 10 Leagues by Players")
-    league_counts = df['league_name'].value_counts().head(10)
-    fig_leagues = px.bar(
-        x=league_counts.values,
-        y=league_counts.index,
-        orientation='h',
-        labels={'x': 'Number of Players', 'y': 'League'},
-        color=league_counts.values,
-        color_continuous_scale='Bluered'
+def additional_statistics_section():
+    st.header("📊 Additional Statistics")
+
+    col_stat1, col_stat2, col_stat3 = st.columns(3)
+
+    with col_stat1:
+        st.subheader("Top 10 Leagues by Players")
+        show_chart('leagues')
+
+    with col_stat2:
+        st.subheader("Work Rate Distribution")
+        show_chart('workrate')
+
+    with col_stat3:
+        st.subheader("Body Type Distribution")
+        show_chart('body')
+
+# Similar players: pick a player and list the closest players by their numeric
+# attributes, among those matching the applied sidebar filter. A fragment, so
+# searching and picking rerun only this section.
+SIMILAR_COLUMNS = ['short_name', 'overall', 'potential', 'value_eur', 'wage_eur',
+                   'age', 'club_name', 'nationality_name']
+
+@st.fragment
+def similar_players_section(df, similarity_index, filter_engine, active_filter):
+    profiler = run_profiler()
+    st.header("🧬 Similar Players")
+    search_col, player_col, k_col = st.columns([1, 2, 1])
+
+    query = search_col.text_input("Search Player", placeholder="Part of a name")
+    if not query:
+        st.caption("Search for a player to see the most similar players.")
+        return
+    matches = df.index[df['short_name'].str.contains(query, case=False, regex=False, na=False)][:50]
+    if len(matches) == 0:
+        st.warning(f"No player name contains {query!r}.")
+        return
+
+    row = player_col.selectbox(
+        "Player",
+        options=list(matches),
+        format_func=lambda r: f"{df['short_name'].iat[r]} ({df['club_name'].iat[r]}, {df['overall'].iat[r]})"
     )
-    fig_leagues.update_layout(
-        height=400,
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
-    )
-    st.plotly_chart(fig_leagues, use_container_width=True)
-
-with col_stat2:
-    st.subheader("Work Rate Distribution")
-    work_rate_counts = df['work_rate'].value_counts().head(10)
-    fig_workrate = px.pie(
-        values=work_rate_counts.values,
-        names=work_rate_counts.index,
-        title='Top 10 Work Rate Patterns',
-        hole=0.4
-    )
-    fig_workrate.update_layout(
-        height=400,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
+    k = k_col.slider("Players To Show", 5, 25, 10)
+
+    candidates = None if active_filter is None else filter_engine.select(*active_filter)
+    with profiler.span('similar.query'):
+        rows, distances = similarity_index.neighbours(row, k, candidates)
+
+    st.dataframe(
+        df.iloc[rows][SIMILAR_COLUMNS].assign(distance=distances.round(2)),
+        hide_index=True,
+        use_container_width=True
     )
-    st.plotly_chart(fig_workrate, use_container_width=True)
-
-with col_stat3:
-    st.subheader("Body Type Distribution")
-    body_type_counts = df['body_type'].value_counts().head(10)
-    fig_body = px.bar(
-        x=body_type_counts.index,
-        y=body_type_counts.values,
-        labels={'x': 'Body Type', 'y': 'Number of Players'},
-        color=body_type_counts.values,
-        color_continuous_scale='Sunset'
+    scope = "players matching the sidebar filters" if active_filter is not None else "all players"
+    st.caption(f"Nearest {len(rows)} of {scope} by {len(similarity_index.columns)} standardized attributes "
+               "(lower distance is more similar)")
+
+# Value explorer: value against overall or potential as a WebGL scatter. The
+# range sliders are the zoom: only players in the visible ranges (and the
+# applied sidebar filter) are queried, and at most SCATTER_POINT_BUDGET of
+# them are drawn, thinned evenly over the view.
+@st.fragment
+def value_explorer_section(df, scatter_index, filter_engine, active_filter, data_version):
+    profiler = run_profiler()
+    st.header("💎 Value Explorer")
+    axis_col, color_col = st.columns(2)
+    x_column = axis_col.radio("Rating", options=SCATTER_X_COLUMNS, format_func=str.title, horizontal=True)
+    color_by = color_col.radio("Colour By", options=['league', 'position'], format_func=str.title,
+                               horizontal=True)
+
+    x_range = st.slider(
+        f"{x_column.title()} Range",
+        int(df[x_column].min()),
+        int(df[x_column].max()),
+        (int(df[x_column].min()), int(df[x_column].max()))
     )
-    fig_body.update_layout(
-        height=400,
-        showlegend=False,
-        xaxis_tickangle=-45,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white')
+    max_value = float(-(-df['value_eur'].max() // 1_000_000))
+    value_range = st.slider("Value Range (M €)", 0.0, max_value, (0.0, max_value), step=0.5)
+
+    rows = None if active_filter is None else filter_engine.select(*active_filter)
+    with profiler.span('scatter.query'):
+        points, n_visible = scatter_index.query(
+            x_column, x_range, (value_range[0] * 1_000_000, value_range[1] * 1_000_000), rows)
+
+    params = {'filter': active_filter, 'x': x_column, 'color': color_by,
+              'x_range': x_range, 'value_range': value_range}
+    with profiler.span('chart.scatter.build'):
+        fig = figure_cache.get_or_build(data_version, 'scatter', params, lambda: value_scatter_figure(
+            scatter_index.x[x_column][points],
+            scatter_index.y[points],
+            color_groups(df, points, color_by),
+            df['short_name'].iloc[points].to_numpy(dtype=object),
+            x_column.title(),
+            color_by.title()
+        ))
+    with profiler.span('chart.scatter.emit'):
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Showing {len(points):,} of {n_visible:,} players in view. At most {SCATTER_POINT_BUDGET:,} "
+               "are drawn; narrow the ranges to see more of them.")
+
+# Below-the-fold sections. In fast-start mode each one is built only once its
+# toggle is switched on; the filtered table is already built only once a
+# filter is applied.
+BELOW_THE_FOLD = {
+    "🌍 Age & Nationality": age_nationality_section,
+    "📊 Additional Statistics": additional_statistics_section,
+}
+if df is not None:
+    BELOW_THE_FOLD["💎 Value Explorer"] = lambda: value_explorer_section(
+        df, scatter_index, filter_engine, active_filter, data_version)
+    BELOW_THE_FOLD["🧬 Similar Players"] = lambda: similar_players_section(
+        df, similarity_index, filter_engine, active_filter)
+for section_name, section in BELOW_THE_FOLD.items():
+    if not FAST_START or st.toggle(f"Show {section_name}", key=f"show {section_name}"):
+        section()
+        st.markdown("---")
+
+# Sidebar with filters.
+# The filters and the table they drive form a fragment: changing a slider or
+# the position selection reruns only this function, not the whole dashboard.
+# Its inputs are passed in explicitly and the table goes to table_slot, a
+# placeholder in the main area that is replaced (not appended to) on each run.
+# Applying or clearing a filter stores it in session state and reruns the
+# whole app once, so every panel is redrawn from the aggregate cube.
+TABLE_LABELS = {
+    'overall': 'Overall', 'potential': 'Potential', 'value_eur': 'Value (€)',
+    'wage_eur': 'Wage (€)', 'age': 'Age'
+}
+
+@st.fragment
+def filtered_players_section(df, position_index, filter_engine, table_slot):
+    profiler = run_profiler()
+    st.header("🔍 Filters")
+    st.markdown("---")
+
+    # Position filter
+    selected_position = st.multiselect(
+        "Select Position(s)",
+        options=sorted(position_index),
+        default=[]
     )
-    st.plotly_chart(fig_body, use_container_width=True)
 
-st.markdown("---")
-
-# Sidebar with filters
-st.sidebar.header("🔍 Filters")
-st.sidebar.markdown("---")
+    # Overall rating filter
+    min_overall, max_overall = st.slider(
+        "Overall Rating Range",
+        int(df['overall'].min()),
+        int(df['overall'].max()),
+        (int(df['overall'].min()), int(df['overall'].max()))
+    )
 
-# Position filter
-positions = df['player_positions'].str.split(',').explode().str.strip().unique()
-selected_position = st.sidebar.multiselect(
-    "Select Position(s)",
-    options=sorted([p for p in positions if pd.notna(p)]),
-    default=[]
-)
+    # Age filter
+    min_age, max_age = st.slider(
+        "Age Range",
+        int(df['age'].min()),
+        int(df['age'].max()),
+        (int(df['age'].min()), int(df['age'].max()))
+    )
 
-# Overall rating filter
-min_overall, max_overall = st.sidebar.slider(
-    "Overall Rating Range",
-    int(df['overall'].min()),
-    int(df['overall'].max()),
-    (int(df['overall'].min()), int(df['overall'].max()))
-)
+    # Apply / clear filters buttons
+    apply_col, clear_col = st.columns(2)
+    if apply_col.button("Apply Filters"):
+        new_filter = filter_engine.normalize(
+            selected_position,
+            [('overall', min_overall, max_overall), ('age', min_age, max_age)]
+        )
+        # An empty selection would leave every panel blank, so it is not applied
+        if len(filter_engine.select(*new_filter)) == 0:
+            st.warning("No players match these filters.")
+        else:
+            st.session_state['active_filter'] = new_filter
+            st.rerun()
+    if clear_col.button("Clear Filters"):
+        st.session_state.pop('active_filter', None)
+        st.rerun()
+
+    active_filter = st.session_state.get('active_filter')
+    if active_filter is None:
+        table_slot.empty()
+        return
+
+    # Row numbers of the matching players; only the displayed rows are materialized
+    with profiler.span('filter.select'):
+        filtered_rows = filter_engine.select(*active_filter)
+
+    st.success(f"Filtered: {len(filtered_rows)} players")
+
+    # Table paging and sorting (served from the engine's pre-sorted indices)
+    st.markdown("---")
+    sort_column = st.selectbox(
+        "Sort Table By",
+        options=SORT_COLUMNS,
+        format_func=lambda col: TABLE_LABELS[col]
+    )
+    descending = st.toggle("Highest First", value=True)
+    page_size = st.selectbox("Rows Per Page", options=[25, 50, 100], index=1)
+    page_count = max(1, -(-len(filtered_rows) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
 
-# Age filter
-min_age, max_age = st.sidebar.slider(
-    "Age Range",
-    int(df['age'].min()),
-    int(df['age'].max()),
-    (int(df['age'].min()), int(df['age'].max()))
-)
+    with profiler.span('filter.page'):
+        page_rows = filter_engine.page(filtered_rows, sort_column, descending, page - 1, page_size)
 
-# Apply filters button
-if st.sidebar.button("Apply Filters"):
-    filtered_df = df.copy()
-    
-    if selected_position:
-        filtered_df = filtered_df[filtered_df['player_positions'].str.contains('|'.join(selected_position), na=False)]
-    
-    filtered_df = filtered_df[
-        (filtered_df['overall'] >= min_overall) & 
-        (filtered_df['overall'] <= max_overall) &
-        (filtered_df['age'] >= min_age) & 
-        (filtered_df['age'] <= max_age)
-    ]
-    
-    st.sidebar.success(f"Filtered: {len(filtered_df)} players")
-    
     # Display filtered data
-    st.subheader("📋 Filtered Player Data")
-    st.dataframe(
-        filtered_df[['short_name', 'overall', 'potential', 'value_eur', 'wage_eur', 
-                     'age', 'club_name', 'nationality_name']].head(50),
-        use_container_width=True
-    )
+    with table_slot.container(), profiler.span('table.emit'):
+        st.subheader("📋 Filtered Player Data")
+        st.dataframe(
+            df.iloc[page_rows][['short_name', 'overall', 'potential', 'value_eur', 'wage_eur',
+                                'age', 'club_name', 'nationality_name']],
+            use_container_width=True
+        )
+        st.caption(f"Page {page} of {page_count}, sorted by {TABLE_LABELS[sort_column]} "
+                   f"({'highest' if descending else 'lowest'} first)")
+
+if df is None:
+    st.sidebar.header("🔍 Filters")
+    st.sidebar.info(f"Streaming mode: summarizing {len(stream_paths)} file(s). "
+                    "Filters need the full data set and are disabled.")
+else:
+    table_slot = st.empty()
+    with st.sidebar:
+        filtered_players_section(df, position_index, filter_engine, table_slot)
 
 # Footer
 st.markdown("---")
 st.markdown(
     """
     <div style='text-align: center; color: gray; padding: 20px;'>
-        <p>⚽ FIFA 22 Players Analysis Dashboard | Data Source: SoFIFA</p>
+        <p>⚽ {} Dashboard | Data Source: SoFIFA</p>
         <p>Created with Streamlit & Plotly | Total Players: {}</p>
     </div>
-    """.format(len(df)),
+    """.format(page_title, snapshot.total_players),
     unsafe_allow_html=True
 )
 
+# Opt-in profiling panel: this run's breakdown and the rolling history
+if DEBUG_PANEL:
+    with st.sidebar.expander("⏱️ Profiling", expanded=False):
+        breakdown = profiler.breakdown()
+        first_metric_col, run_col = st.columns(2)
+        first_metric_col.metric("First Metric", f"{profiler.elapsed_ms('first_metric'):.0f} ms")
+        run_col.metric("This Run", f"{(time.perf_counter() - profiler.started) * 1000:.0f} ms")
+        st.dataframe(breakdown, hide_index=True, use_container_width=True)
+        st.caption("Rolling history (all sessions)")
+        st.dataframe(profiler.history.percentiles().round(2), hide_index=True, use_container_width=True)
+        st.download_button("Download spans (JSON lines)", profiler.to_jsonl(),
+                           file_name=f"spans-{profiler.run_id}.jsonl", mime="application/x-ndjson")
+
 
 
 # streamlit run app.py
\ No newline at end of file
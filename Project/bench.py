@@ -0,0 +1,280 @@
+"""
+Headless benchmark for the dashboard.
+
+Runs app.py through Streamlit's AppTest against synthetic player data sets
+and records cold-start time, time to the first KPI metric, per-rerun wall
+time, scripted filter interactions, per-section timings, peak RSS and
+serialized bytes per chart.
+Each data set size runs in its own process so peak RSS is not shared.
+
+    python bench.py                              # 20k, 200k and 2M rows
+    python bench.py --sizes 20000 --reruns 10
+    python bench.py --update-baseline            # store results as the baseline
+    python bench.py --fast-start                 # run the app with DASHBOARD_FAST_START=1
+
+Results are compared against bench_baseline.json (if present); any metric
+slower or larger than the baseline by more than --tolerance is reported as
+a regression and the exit code is 1.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(PROJECT_DIRECTORY, 'app.py')
+DEFAULT_SIZES = [20_000, 200_000, 2_000_000]
+DEFAULT_BASELINE = os.path.join(PROJECT_DIRECTORY, 'bench_baseline.json')
+
+POSITIONS = ['GK', 'CB', 'LB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM', 'LM', 'RM', 'LW', 'RW', 'CF', 'ST']
+NATIONALITIES = ['England', 'Germany', 'Spain', 'France', 'Argentina', 'Brazil', 'Italy', 'Netherlands',
+                 'Portugal', 'Korea Republic', 'Scotland', 'United States', 'China PR', 'Japan', 'Mexico']
+WORK_RATES = ['Medium/Medium', 'High/Medium', 'Medium/High', 'High/High', 'Low/Medium', 'Medium/Low']
+BODY_TYPES = ['Normal (170-185)', 'Lean (170-185)', 'Stocky (185+)', 'Normal (185+)', 'Lean (185+)', 'Unique']
+
+
+def make_players(n_rows, seed=0):
+    """A synthetic frame with the columns and rough distributions of players_22_cleaned.csv."""
+    rng = np.random.default_rng(seed)
+
+    # Position strings are drawn from a fixed pool of combinations, as in the real data
+    pool = [', '.join(rng.choice(POSITIONS, rng.integers(1, 4), replace=False)) for _ in range(600)]
+    overall = rng.integers(47, 94, n_rows)
+    value = (rng.gamma(1.2, 3e6, n_rows) // 500) * 500
+    wage = (rng.gamma(1.2, 1e4, n_rows) // 500) * 500
+    value[rng.random(n_rows) < 0.01] = np.nan
+    wage[rng.random(n_rows) < 0.01] = np.nan
+
+    return pd.DataFrame({
+        'sofifa_id': np.arange(n_rows),
+        'short_name': pd.Series(np.arange(n_rows)).map('P. Player{}'.format),
+        'player_positions': np.asarray(pool, dtype=object)[rng.integers(0, len(pool), n_rows)],
+        'overall': overall,
+        'potential': np.minimum(overall + rng.integers(0, 15, n_rows), 95),
+        'value_eur': value,
+        'wage_eur': wage,
+        'age': rng.integers(16, 45, n_rows),
+        'club_name': rng.choice([f'Club {i}' for i in range(700)], n_rows),
+        'league_name': rng.choice([f'League {i}' for i in range(55)], n_rows),
+        'nationality_name': rng.choice(NATIONALITIES, n_rows),
+        'preferred_foot': rng.choice(['Right', 'Left'], n_rows, p=[0.76, 0.24]),
+        'work_rate': rng.choice(WORK_RATES, n_rows),
+        'body_type': rng.choice(BODY_TYPES, n_rows),
+    })
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed(fn, *args, **kwargs):
+    """Returns (result, seconds)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def chart_bytes(at):
+    """Serialized spec size of every chart on the page, keyed by chart title."""
+    sizes = {}
+    for i, chart in enumerate(at.get('plotly_chart')):
+        spec = chart.proto.spec
+        title = json.loads(spec).get('layout', {}).get('title', {}).get('text') or f'chart {i}'
+        sizes[title] = len(spec.encode())
+    return sizes
+
+
+def first_metric_times(spans_path):
+    """Seconds from script start to the first KPI metric, per run, read from the app's span log."""
+    with open(spans_path) as f:
+        spans = [json.loads(line) for line in f]
+    return [span['ms'] / 1000 for span in spans if span['name'] == 'first_metric']
+
+
+def section_timings(csv_path):
+    """Times the building blocks behind each dashboard section directly, outside Streamlit."""
+    from aggregates import AggregateCube, build_snapshot, histogram_bins
+    from data_store import read_players
+    from figures import (age_figure, body_type_figure, clubs_figure, foot_figure, histogram_figure,
+                         leagues_figure, nationality_figure, work_rate_figure)
+    from filters import FilterEngine, build_position_index
+
+    timings = {}
+    df, timings['load_sidecar'] = timed(read_players, csv_path)
+    snapshot, timings['snapshot'] = timed(build_snapshot, df)
+    position_index, timings['position_index'] = timed(build_position_index, df['player_positions'])
+    engine, timings['filter_engine'] = timed(FilterEngine, df, position_index)
+    cube, timings['aggregate_cube'] = timed(AggregateCube, df)
+
+    key = engine.normalize(['CB', 'ST'], [('overall', 60, 80), ('age', 20, 30)])
+    rows, timings['filter_select'] = timed(engine.select, *key)
+    _, timings['filter_page'] = timed(engine.page, rows, 'value_eur', True, 3, 50)
+    _, timings['cube_query'] = timed(cube.query, key)
+
+    builders = {
+        'clubs': lambda: clubs_figure(snapshot.club_value),
+        'overall': lambda: histogram_figure(*histogram_bins(df['overall'].to_numpy()), 'Overall', 'Overall'),
+        'potential': lambda: histogram_figure(*histogram_bins(df['potential'].to_numpy()), 'Potential', 'Potential'),
+        'foot': lambda: foot_figure(snapshot.foot_counts),
+        'age': lambda: age_figure(snapshot.age_counts),
+        'map': lambda: nationality_figure(snapshot.country_counts),
+        'leagues': lambda: leagues_figure(snapshot.league_counts),
+        'workrate': lambda: work_rate_figure(snapshot.work_rate_counts),
+        'body': lambda: body_type_figure(snapshot.body_type_counts),
+    }
+    for name, build in builders.items():
+        _, timings[f'figure_{name}'] = timed(build)
+    return timings
+
+
+def run_worker(n_rows, reruns):
+    """Benchmarks one data set size in this process and returns the results as a dict."""
+    from streamlit.testing.v1 import AppTest
+
+    workdir = tempfile.mkdtemp(prefix='dashboard-bench-')
+    try:
+        os.chdir(workdir)
+        sys.path.insert(0, PROJECT_DIRECTORY)
+        make_players(n_rows).to_csv('players_22_cleaned.csv', index=False)
+        result = {'rows': n_rows}
+        os.environ['DASHBOARD_SPANS_LOG'] = os.path.join(workdir, 'spans.jsonl')
+
+        # Cold start: no sidecar and empty Streamlit caches
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+        _, result['cold_start_s'] = timed(at.run)
+        if at.exception:
+            raise RuntimeError(f"app raised: {at.exception[0].message}")
+        result['chart_bytes'] = chart_bytes(at)
+
+        rerun_times = [timed(at.run)[1] for _ in range(reruns)]
+        result['rerun_s'] = {'median': float(np.median(rerun_times)), 'max': max(rerun_times)}
+        first_metric = first_metric_times(os.environ['DASHBOARD_SPANS_LOG'])
+        result['first_metric_s'] = {'cold': first_metric[0], 'warm': float(np.median(first_metric[1:]))}
+
+        # Scripted sidebar interactions
+        interactions = {}
+        at.sidebar.multiselect[0].select('CB').select('ST')
+        _, interactions['select_positions'] = timed(at.run)
+        at.sidebar.slider[0].set_range(60, 80)
+        _, interactions['overall_slider'] = timed(at.run)
+        at.sidebar.slider[1].set_range(20, 30)
+        _, interactions['age_slider'] = timed(at.run)
+        at.sidebar.button[0].click()
+        _, interactions['apply_filters'] = timed(at.run)
+        result['filtered_chart_bytes'] = chart_bytes(at)
+        if at.sidebar.number_input:
+            at.sidebar.number_input[0].set_value(2)
+            _, interactions['next_page'] = timed(at.run)
+        at.sidebar.button[1].click()
+        _, interactions['clear_filters'] = timed(at.run)
+        result['interaction_s'] = interactions
+
+        result['section_s'] = section_timings('players_22_cleaned.csv')
+        result['peak_rss_mb'] = peak_rss_mb()
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def flatten(result, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1}, for comparing results metric by metric."""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and key != 'rows':
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of (size, metric, baseline, current) that got worse than tolerance allows."""
+    regressions = []
+    for size, result in results.items():
+        if size not in baseline:
+            continue
+        old = flatten(baseline[size])
+        for metric, value in flatten(result).items():
+            # Ignore sub-millisecond noise on timings
+            if metric in old and value > old[metric] * tolerance and value - old[metric] > 1e-3:
+                regressions.append((size, metric, old[metric], value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FIFA dashboard headlessly.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help="allowed ratio to the baseline before a metric counts as a regression")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    parser.add_argument('--fast-start', action='store_true',
+                        help="benchmark the fast-start mode (sections below the KPIs built on demand)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.fast_start:
+        os.environ['DASHBOARD_FAST_START'] = '1'
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.reruns)))
+        return 0
+
+    results = {}
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} rows...", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', str(size), '--reruns', str(args.reruns)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return proc.returncode
+        results[str(size)] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    for size, result in results.items():
+        print(f"\n{int(size):,} rows")
+        print(f"  cold start        {result['cold_start_s']:.3f} s")
+        print(f"  first metric      {result['first_metric_s']['cold']:.3f} s cold, "
+              f"{result['first_metric_s']['warm']:.3f} s warm")
+        print(f"  rerun (median)    {result['rerun_s']['median']:.3f} s")
+        print(f"  peak RSS          {result['peak_rss_mb']:.0f} MB")
+        for name, seconds in result['interaction_s'].items():
+            print(f"  {name:<17} {seconds:.3f} s")
+        print(f"  chart bytes       {sum(result['chart_bytes'].values()):,} total")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for size, metric, old, new in regressions:
+            print(f"REGRESSION {int(size):,} rows: {metric} {old:.4g} -> {new:.4g}")
+        if regressions:
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
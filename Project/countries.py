@@ -0,0 +1,89 @@
+# FIFA/SoFIFA nationality names -> ISO 3166-1 alpha-3 codes.
+# England, Scotland, Wales and Northern Ireland have no ISO-3 code of their
+# own; they are drawn as the United Kingdom so none of their players are lost.
+COUNTRY_ISO3 = {
+    'Afghanistan': 'AFG', 'Albania': 'ALB', 'Algeria': 'DZA', 'American Samoa': 'ASM',
+    'Andorra': 'AND', 'Angola': 'AGO', 'Anguilla': 'AIA', 'Antigua and Barbuda': 'ATG',
+    'Argentina': 'ARG', 'Armenia': 'ARM', 'Aruba': 'ABW', 'Australia': 'AUS',
+    'Austria': 'AUT', 'Azerbaijan': 'AZE', 'Bahamas': 'BHS', 'Bahrain': 'BHR',
+    'Bangladesh': 'BGD', 'Barbados': 'BRB', 'Belarus': 'BLR', 'Belgium': 'BEL',
+    'Belize': 'BLZ', 'Benin': 'BEN', 'Bermuda': 'BMU', 'Bhutan': 'BTN',
+    'Bolivia': 'BOL', 'Bosnia and Herzegovina': 'BIH', 'Bosnia Herzegovina': 'BIH',
+    'Botswana': 'BWA', 'Brazil': 'BRA', 'British Virgin Islands': 'VGB',
+    'Brunei Darussalam': 'BRN', 'Bulgaria': 'BGR', 'Burkina Faso': 'BFA',
+    'Burundi': 'BDI', 'Cambodia': 'KHM', 'Cameroon': 'CMR', 'Canada': 'CAN',
+    'Cape Verde Islands': 'CPV', 'Cape Verde': 'CPV', 'Cayman Islands': 'CYM',
+    'Central African Republic': 'CAF', 'Chad': 'TCD', 'Chile': 'CHL',
+    'China PR': 'CHN', 'China': 'CHN', 'Chinese Taipei': 'TWN', 'Colombia': 'COL',
+    'Comoros': 'COM', 'Congo': 'COG', 'Congo DR': 'COD', 'DR Congo': 'COD',
+    'Cook Islands': 'COK', 'Costa Rica': 'CRI', "Côte d'Ivoire": 'CIV',
+    'Ivory Coast': 'CIV', 'Croatia': 'HRV', 'Cuba': 'CUB', 'Curacao': 'CUW',
+    'Curaçao': 'CUW', 'Cyprus': 'CYP', 'Czech Republic': 'CZE', 'Czechia': 'CZE',
+    'Denmark': 'DNK', 'Djibouti': 'DJI', 'Dominica': 'DMA',
+    'Dominican Republic': 'DOM', 'Ecuador': 'ECU', 'Egypt': 'EGY',
+    'El Salvador': 'SLV', 'England': 'GBR', 'Equatorial Guinea': 'GNQ',
+    'Eritrea': 'ERI', 'Estonia': 'EST', 'Eswatini': 'SWZ', 'Ethiopia': 'ETH',
+    'Faroe Islands': 'FRO', 'Fiji': 'FJI', 'Finland': 'FIN', 'France': 'FRA',
+    'French Guiana': 'GUF', 'Gabon': 'GAB', 'Gambia': 'GMB', 'Georgia': 'GEO',
+    'Germany': 'DEU', 'Ghana': 'GHA', 'Gibraltar': 'GIB', 'Greece': 'GRC',
+    'Grenada': 'GRD', 'Guadeloupe': 'GLP', 'Guam': 'GUM', 'Guatemala': 'GTM',
+    'Guinea': 'GIN', 'Guinea Bissau': 'GNB', 'Guinea-Bissau': 'GNB', 'Guyana': 'GUY',
+    'Haiti': 'HTI', 'Honduras': 'HND', 'Hong Kong': 'HKG', 'Hungary': 'HUN',
+    'Iceland': 'ISL', 'India': 'IND', 'Indonesia': 'IDN', 'Iran': 'IRN',
+    'IR Iran': 'IRN', 'Iraq': 'IRQ', 'Israel': 'ISR', 'Italy': 'ITA',
+    'Jamaica': 'JAM', 'Japan': 'JPN', 'Jordan': 'JOR', 'Kazakhstan': 'KAZ',
+    'Kenya': 'KEN', 'Korea DPR': 'PRK', 'Korea Republic': 'KOR', 'Kosovo': 'XKX',
+    'Kuwait': 'KWT', 'Kyrgyzstan': 'KGZ', 'Kyrgyz Republic': 'KGZ', 'Laos': 'LAO',
+    'Latvia': 'LVA', 'Lebanon': 'LBN', 'Lesotho': 'LSO', 'Liberia': 'LBR',
+    'Libya': 'LBY', 'Liechtenstein': 'LIE', 'Lithuania': 'LTU', 'Luxembourg': 'LUX',
+    'Macau': 'MAC', 'Madagascar': 'MDG', 'Malawi': 'MWI', 'Malaysia': 'MYS',
+    'Maldives': 'MDV', 'Mali': 'MLI', 'Malta': 'MLT', 'Martinique': 'MTQ',
+    'Mauritania': 'MRT', 'Mauritius': 'MUS', 'Mexico': 'MEX', 'Moldova': 'MDA',
+    'Mongolia': 'MNG', 'Montenegro': 'MNE', 'Montserrat': 'MSR', 'Morocco': 'MAR',
+    'Mozambique': 'MOZ', 'Myanmar': 'MMR', 'Namibia': 'NAM', 'Nepal': 'NPL',
+    'Netherlands': 'NLD', 'New Caledonia': 'NCL', 'New Zealand': 'NZL',
+    'Nicaragua': 'NIC', 'Niger': 'NER', 'Nigeria': 'NGA', 'North Macedonia': 'MKD',
+    'FYR Macedonia': 'MKD', 'Northern Ireland': 'GBR', 'Norway': 'NOR', 'Oman': 'OMN',
+    'Pakistan': 'PAK', 'Palestine': 'PSE', 'Panama': 'PAN', 'Papua New Guinea': 'PNG',
+    'Paraguay': 'PRY', 'Peru': 'PER', 'Philippines': 'PHL', 'Poland': 'POL',
+    'Portugal': 'PRT', 'Puerto Rico': 'PRI', 'Qatar': 'QAT',
+    'Republic of Ireland': 'IRL', 'Ireland': 'IRL', 'Réunion': 'REU', 'Romania': 'ROU',
+    'Russia': 'RUS', 'Rwanda': 'RWA', 'Saint Kitts and Nevis': 'KNA',
+    'St. Kitts and Nevis': 'KNA', 'Saint Lucia': 'LCA', 'St. Lucia': 'LCA',
+    'Saint Vincent and the Grenadines': 'VCT', 'St. Vincent and the Grenadines': 'VCT',
+    'Samoa': 'WSM', 'San Marino': 'SMR', 'São Tomé e Príncipe': 'STP',
+    'Sao Tome e Principe': 'STP', 'Saudi Arabia': 'SAU', 'Scotland': 'GBR',
+    'Senegal': 'SEN', 'Serbia': 'SRB', 'Seychelles': 'SYC', 'Sierra Leone': 'SLE',
+    'Singapore': 'SGP', 'Slovakia': 'SVK', 'Slovenia': 'SVN', 'Solomon Islands': 'SLB',
+    'Somalia': 'SOM', 'South Africa': 'ZAF', 'South Sudan': 'SSD', 'Spain': 'ESP',
+    'Sri Lanka': 'LKA', 'Sudan': 'SDN', 'Suriname': 'SUR', 'Sweden': 'SWE',
+    'Switzerland': 'CHE', 'Syria': 'SYR', 'Tahiti': 'PYF', 'Tajikistan': 'TJK',
+    'Tanzania': 'TZA', 'Thailand': 'THA', 'Timor-Leste': 'TLS', 'Togo': 'TGO',
+    'Tonga': 'TON', 'Trinidad and Tobago': 'TTO', 'Trinidad & Tobago': 'TTO',
+    'Tunisia': 'TUN', 'Turkey': 'TUR', 'Türkiye': 'TUR', 'Turkmenistan': 'TKM',
+    'Turks and Caicos Islands': 'TCA', 'Uganda': 'UGA', 'Ukraine': 'UKR',
+    'United Arab Emirates': 'ARE', 'United States': 'USA', 'USA': 'USA',
+    'Uruguay': 'URY', 'US Virgin Islands': 'VIR', 'Uzbekistan': 'UZB',
+    'Vanuatu': 'VUT', 'Venezuela': 'VEN', 'Vietnam': 'VNM', 'Wales': 'GBR',
+    'Yemen': 'YEM', 'Zambia': 'ZMB', 'Zimbabwe': 'ZWE',
+}
+
+# Display name per code, used for the map hover text
+ISO3_NAMES = {
+    'GBR': 'United Kingdom (England, Scotland, Wales, Northern Ireland)',
+    'CHN': 'China PR', 'KOR': 'Korea Republic', 'PRK': 'Korea DPR',
+    'COD': 'Congo DR', 'IRL': 'Republic of Ireland',
+}
+for _name, _code in COUNTRY_ISO3.items():
+    ISO3_NAMES.setdefault(_code, _name)
+
+
+def nationality_to_iso3(nationality):
+    """
+    Maps a nationality column to a categorical of ISO-3 codes (NaN where the
+    name is unknown). Only the distinct names are looked up, not every row.
+    """
+    codes = nationality.astype('category').map(
+        lambda name: COUNTRY_ISO3.get(str(name).strip()), na_action='ignore'
+    )
+    return codes.astype('category').rename('nationality_iso3')
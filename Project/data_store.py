@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from aggregates import AGE_BINS, AGE_LABELS
+from countries import nationality_to_iso3
+
+# --- Configuration ---
+DATA_FILE = 'players_22_cleaned.csv'
+CACHE_DIRECTORY = '.cache'
+
+# Low-cardinality text columns that are always stored as categoricals
+CATEGORY_COLUMNS = [
+    'club_name', 'nationality_name', 'league_name',
+    'work_rate', 'body_type', 'preferred_foot'
+]
+
+# Any other text column with fewer unique values than this share of rows
+# is stored as a categorical as well
+CATEGORY_MAX_RATIO = 0.5
+
+# Bumped whenever the sidecar layout changes, so older sidecars are rebuilt
+SIDECAR_FORMAT = 3
+
+
+def file_hash(path):
+    """Returns the SHA-256 hex digest of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sidecar_paths(csv_path):
+    """Returns the (parquet, meta) paths of the typed sidecar for a CSV."""
+    folder = os.path.join(os.path.dirname(csv_path) or '.', CACHE_DIRECTORY)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return (os.path.join(folder, f"{stem}.parquet"),
+            os.path.join(folder, f"{stem}.meta.json"))
+
+
+def optimize_dtypes(df):
+    """
+    Shrinks a freshly parsed frame: text columns become categoricals and
+    numeric columns are downcast to the smallest lossless dtype.
+    """
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            if col in CATEGORY_COLUMNS or series.nunique() < CATEGORY_MAX_RATIO * len(series):
+                df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            # Only keep float32 when it round-trips every value exactly,
+            # otherwise the column stays float64
+            downcast = series.astype('float32')
+            if downcast.astype('float64').equals(series):
+                df[col] = downcast
+    return df
+
+
+def add_derived_columns(df):
+    """
+    Adds the columns resolved once at ingestion time instead of on every
+    render: nationality_iso3, the ISO-3 code of nationality_name, and
+    age_group, the treemap age bucket of age.
+    """
+    if 'nationality_name' in df.columns and 'nationality_iso3' not in df.columns:
+        df['nationality_iso3'] = nationality_to_iso3(df['nationality_name'])
+    if 'age' in df.columns and 'age_group' not in df.columns:
+        df['age_group'] = pd.cut(df['age'], bins=AGE_BINS, labels=AGE_LABELS)
+    return df
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def sidecar_is_fresh(csv_path):
+    """
+    Checks the sidecar against the source CSV. A matching mtime and size is
+    trusted as is; otherwise the content hash decides, so a touched but
+    unchanged CSV does not force a rebuild.
+    """
+    parquet_path, meta_path = sidecar_paths(csv_path)
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get('format') != SIDECAR_FORMAT or not os.path.exists(parquet_path):
+        return False
+
+    stat = os.stat(csv_path)
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return True
+
+    if meta.get('sha256') != file_hash(csv_path):
+        return False
+
+    # Same content, new timestamp: remember it so the next check is cheap
+    meta['mtime_ns'] = stat.st_mtime_ns
+    meta['size'] = stat.st_size
+    _write_meta(meta_path, meta)
+    return True
+
+
+def build_sidecar(csv_path):
+    """Parses the CSV once and writes the typed Parquet sidecar plus its metadata."""
+    parquet_path, meta_path = sidecar_paths(csv_path)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+
+    df = add_derived_columns(optimize_dtypes(pd.read_csv(csv_path)))
+
+    # Write to a temporary file first so a crash never leaves a half-written sidecar
+    tmp_path = parquet_path + '.tmp'
+    df.to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, parquet_path)
+
+    stat = os.stat(csv_path)
+    _write_meta(meta_path, {
+        'format': SIDECAR_FORMAT,
+        'source': os.path.basename(csv_path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': file_hash(csv_path),
+    })
+    return df
+
+
+def read_players(csv_path=DATA_FILE):
+    """Returns the typed players frame, rebuilding the sidecar only when the CSV changed."""
+    if sidecar_is_fresh(csv_path):
+        parquet_path, _ = sidecar_paths(csv_path)
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+    return build_sidecar(csv_path)
+
+
+def dataset_version(csv_path=DATA_FILE):
+    """Returns the content hash of the CSV, used as a cache key (cheap while the sidecar is fresh)."""
+    if sidecar_is_fresh(csv_path):
+        _, meta_path = sidecar_paths(csv_path)
+        return _read_meta(meta_path)['sha256']
+    return file_hash(csv_path)
+
+
+# Columns the dashboard aggregates need; everything else is skipped when streaming
+STREAM_COLUMNS = [
+    'short_name', 'overall', 'potential', 'value_eur', 'wage_eur', 'age',
+    'club_name', 'nationality_name', 'league_name', 'work_rate', 'body_type',
+    'preferred_foot'
+]
+
+
+def iter_player_chunks(paths, chunksize=250_000, columns=STREAM_COLUMNS):
+    """
+    Yields the player rows of every CSV or Parquet file in paths as frames of
+    at most chunksize rows, reading only the given columns.
+    """
+    for path in paths:
+        if path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+                yield add_derived_columns(batch.to_pandas())
+        else:
+            for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+                yield add_derived_columns(chunk)
+
+
+def sources_version(paths):
+    """A cheap cache key for a set of files: their paths, sizes and modification times."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+# --- Season partitions ---
+# One file per FIFA edition, e.g. data/players_15.parquet or data/players_22.csv
+SEASONS_DIRECTORY = 'data'
+SEASON_FILE_PATTERN = re.compile(r'^players_(\d{2})(?:_[\w-]+)?\.(csv|parquet)$')
+
+
+def discover_seasons(directory=SEASONS_DIRECTORY):
+    """
+    Returns {season: path} for the season files in directory, oldest first.
+    Only file names are listed here; nothing is read until a season is loaded.
+    When a season has both a CSV and a Parquet file, the Parquet file wins.
+    """
+    if not os.path.isdir(directory):
+        return {}
+    seasons = {}
+    for name in sorted(os.listdir(directory)):
+        match = SEASON_FILE_PATTERN.match(name)
+        if not match:
+            continue
+        season, extension = match.groups()
+        if extension == 'parquet' or season not in seasons:
+            seasons[season] = os.path.join(directory, name)
+    return dict(sorted(seasons.items()))
+
+
+def read_season(path):
+    """Loads one season partition as a typed frame."""
+    if path.endswith('.parquet'):
+        return add_derived_columns(pd.read_parquet(path, engine='pyarrow'))
+    return read_players(path)
+
+
+def season_version(path):
+    """Cache key of a season partition (content hash for CSVs, size/mtime for Parquet)."""
+    if path.endswith('.parquet'):
+        return sources_version([path])
+    return dataset_version(path)
+
+
+def write_season_partition(csv_path, season, directory=SEASONS_DIRECTORY):
+    """Converts a players CSV into the typed Parquet partition for a season and returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"players_{season}.parquet")
+    tmp_path = path + '.tmp'
+    df = add_derived_columns(optimize_dtypes(pd.read_csv(csv_path)))
+    df.to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+# --- Shared memory-mapped data ---
+# The typed frame of a data file is also written as an uncompressed Arrow IPC
+# file under .cache/. Every session maps that one file read-only, so numeric
+# columns are views of the page cache rather than per-session copies.
+
+def shared_table_path(path):
+    """Returns the path of the Arrow file for a players CSV or season partition."""
+    folder = os.path.join(os.path.dirname(path) or '.', CACHE_DIRECTORY)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(folder, f"{stem}.arrow")
+
+
+def to_arrow_table(df):
+    """
+    Converts a typed frame to an Arrow table. Float columns keep NaN as a
+    value instead of a null, so they can be read back without a copy.
+    """
+    import pyarrow as pa
+
+    arrays = [
+        pa.array(df[col].to_numpy(), from_pandas=False)
+        if pd.api.types.is_float_dtype(df[col]) else pa.Array.from_pandas(df[col])
+        for col in df.columns
+    ]
+    return pa.Table.from_arrays(arrays, names=list(df.columns))
+
+
+def write_arrow_file(df, arrow_path, version):
+    """Writes a typed frame as an uncompressed Arrow IPC file tagged with its dataset version."""
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(arrow_path) or '.', exist_ok=True)
+    table = to_arrow_table(df)
+    table = table.replace_schema_metadata({'version': version, 'format': str(SIDECAR_FORMAT)})
+
+    tmp_path = arrow_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+    return arrow_path
+
+
+def read_arrow_file(arrow_path):
+    """Memory-maps an Arrow file written by write_arrow_file and returns it as a frame."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(arrow_path)).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def write_shared_table(path, version):
+    """Writes the Arrow file for a data file, tagged with its dataset version."""
+    return write_arrow_file(read_season(path), shared_table_path(path), version)
+
+
+def arrow_file_version(arrow_path):
+    """The dataset version an Arrow file was written for (None if unreadable or outdated)."""
+    import pyarrow as pa
+
+    try:
+        metadata = pa.ipc.open_file(pa.memory_map(arrow_path)).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if metadata.get(b'format') != str(SIDECAR_FORMAT).encode():
+        return None
+    return metadata.get(b'version', b'').decode()
+
+
+def open_shared_players(path, version):
+    """
+    Returns the players frame of a data file backed by its memory-mapped Arrow
+    file, (re)writing that file first when it is missing or from another
+    version. Numeric columns without nulls are zero-copy, read-only views.
+    """
+    arrow_path = shared_table_path(path)
+    if arrow_file_version(arrow_path) != version:
+        write_shared_table(path, version)
+    return read_arrow_file(arrow_path)
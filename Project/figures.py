@@ -0,0 +1,280 @@
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from countries import ISO3_NAMES
+
+# plotly is imported inside the builders: a warm figure cache (or a precomputed
+# bundle) serves every chart without loading plotly.express at all
+
+# Transparent background and white text shared by every chart
+DARK_LAYOUT = dict(
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='white')
+)
+
+# Bins of the rating histograms (part of their figure cache key)
+HISTOGRAM_BINS = 30
+
+
+class FigureCache:
+    """
+    Finished Plotly figures keyed by dataset version, chart id and chart
+    parameters, shared by all sessions.
+
+    Entries are evicted least-recently-used once the serialized JSON of all
+    cached figures exceeds max_bytes. The figure object is kept next to its
+    JSON size because st.plotly_chart re-validates a plain dict spec, which
+    costs about as much as rebuilding it; cached figures must not be mutated.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(version, chart_id, params=None):
+        return (version, chart_id, json.dumps(params or {}, sort_keys=True, default=str))
+
+    def get_or_build(self, version, chart_id, params, build):
+        """Returns the cached figure for the key, calling build() only on a miss."""
+        key = self.make_key(version, chart_id, params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        fig = build()
+        size = len(fig.to_json())
+
+        with self._lock:
+            if key in self._entries:
+                # Another session built the same chart meanwhile; keep its copy
+                fig = self._entries[key][0]
+            else:
+                self._entries[key] = (fig, size)
+                self.total_bytes += size
+            self._entries.move_to_end(key)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return fig
+
+    def put(self, version, chart_id, params, fig):
+        """Stores a figure built elsewhere (e.g. loaded from a precomputed bundle)."""
+        self.get_or_build(version, chart_id, params, lambda: fig)
+
+
+def clubs_figure(club_value):
+    """Top 20 clubs by total player value (club_value is a sorted Series in euros)."""
+    import plotly.express as px
+    club_value_df = pd.DataFrame({
+        'Club': club_value.index,
+        'Value': club_value.values / 1_000_000_000  # Convert to billions
+    })
+    fig = px.bar(
+        club_value_df.head(20),
+        y='Club',
+        x='Value',
+        orientation='h',
+        title='Top 20 Clubs by Total Value',
+        labels={'Value': 'Value (Billions €)', 'Club': ''},
+        color='Value',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(height=600, showlegend=False, **DARK_LAYOUT)
+    return fig
+
+
+def histogram_figure(counts, edges, title, x_label):
+    """Draws pre-binned counts as touching bars, like px.histogram would."""
+    import plotly.graph_objects as go
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(
+        x=centers,
+        y=counts,
+        width=edges[1:] - edges[:-1],
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=x_label + ': %{customdata[0]:.1f} - %{customdata[1]:.1f}<br>'
+                      'Number of Players: %{y}<extra></extra>',
+        marker_color='#1f77b4'
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title='Number of Players',
+        bargap=0,
+        height=300,
+        showlegend=False,
+        **DARK_LAYOUT
+    )
+    return fig
+
+
+def foot_figure(foot_counts):
+    import plotly.express as px
+    fig = px.bar(
+        x=foot_counts.index,
+        y=foot_counts.values,
+        title='Distribution by Preferred Foot',
+        labels={'x': 'Preferred Foot', 'y': 'Number of Players'},
+        color=foot_counts.index,
+        color_discrete_map={'Right': '#1f77b4', 'Left': '#ff9800'}
+    )
+    fig.update_layout(height=300, showlegend=False, **DARK_LAYOUT)
+    return fig
+
+
+def age_figure(age_counts):
+    import plotly.express as px
+    age_counts = age_counts.rename_axis('age_group').reset_index(name='count')
+    fig = px.treemap(
+        age_counts,
+        path=['age_group'],
+        values='count',
+        title='Players by Age Groups',
+        color='count',
+        color_continuous_scale='RdYlGn'
+    )
+    fig.update_layout(height=500, **DARK_LAYOUT)
+    fig.update_traces(textinfo="label+value+percent parent")
+    return fig
+
+
+def nationality_figure(country_counts):
+    """Choropleth of player counts per country, drawn from pre-resolved ISO-3 codes."""
+    import plotly.express as px
+    country_df = pd.DataFrame({
+        'iso3': country_counts.index.astype(str),
+        'country': [ISO3_NAMES.get(code, code) for code in country_counts.index],
+        'count': country_counts.values
+    })
+
+    fig = px.choropleth(
+        country_df,
+        locations='iso3',
+        locationmode='ISO-3',
+        color='count',
+        hover_name='country',
+        hover_data={'count': True, 'iso3': False},
+        title='Players by Country',
+        color_continuous_scale='Blues',
+        labels={'count': 'Number of Players'}
+    )
+    fig.update_layout(
+        height=500,
+        geo=dict(
+            showframe=False,
+            showcoastlines=True,
+            projection_type='natural earth',
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        **DARK_LAYOUT
+    )
+    return fig
+
+
+def leagues_figure(league_counts):
+    import plotly.express as px
+    league_counts = league_counts.head(10)
+    fig = px.bar(
+        x=league_counts.values,
+        y=league_counts.index,
+        orientation='h',
+        labels={'x': 'Number of Players', 'y': 'League'},
+        color=league_counts.values,
+        color_continuous_scale='Bluered'
+    )
+    fig.update_layout(height=400, showlegend=False, **DARK_LAYOUT)
+    return fig
+
+
+def work_rate_figure(work_rate_counts):
+    import plotly.express as px
+    work_rate_counts = work_rate_counts.head(10)
+    fig = px.pie(
+        values=work_rate_counts.values,
+        names=work_rate_counts.index,
+        title='Top 10 Work Rate Patterns',
+        hole=0.4
+    )
+    fig.update_layout(height=400, **DARK_LAYOUT)
+    return fig
+
+
+def body_type_figure(body_type_counts):
+    import plotly.express as px
+    body_type_counts = body_type_counts.head(10)
+    fig = px.bar(
+        x=body_type_counts.index,
+        y=body_type_counts.values,
+        labels={'x': 'Body Type', 'y': 'Number of Players'},
+        color=body_type_counts.values,
+        color_continuous_scale='Sunset'
+    )
+    fig.update_layout(height=400, showlegend=False, xaxis_tickangle=-45, **DARK_LAYOUT)
+    return fig
+
+
+def value_scatter_figure(x, y, groups, names, x_label, color_label):
+    """
+    Value against a rating as WebGL markers (Scattergl), one trace per colour
+    group, largest group first and "Other" last. Values use a log axis.
+    """
+    import plotly.graph_objects as go
+
+    labels = pd.Series(groups).value_counts().index.tolist()
+    if 'Other' in labels:
+        labels.remove('Other')
+        labels.append('Other')
+
+    fig = go.Figure()
+    for label in labels:
+        selected = groups == label
+        fig.add_trace(go.Scattergl(
+            x=x[selected],
+            y=y[selected],
+            text=names[selected],
+            name=label,
+            mode='markers',
+            marker=dict(size=5, opacity=0.6),
+            hovertemplate='%{text}<br>' + x_label + ': %{x}<br>Value: %{y:,.0f} €<extra>' + label + '</extra>'
+        ))
+    fig.update_layout(
+        xaxis_title=x_label,
+        yaxis_title='Value (€)',
+        yaxis_type='log',
+        legend_title_text=color_label,
+        height=500,
+        **DARK_LAYOUT
+    )
+    return fig
+
+
+def _histogram_chart(column, title, x_label, nbins=HISTOGRAM_BINS):
+    """(cache-key parameters, builder) of a rating histogram; the builder bins with the nbins of its key."""
+    params = {'nbins': nbins}
+    return params, lambda view, histogram_for: histogram_figure(
+        *histogram_for(column, params['nbins']), title, x_label)
+
+
+# Every dashboard chart: id -> (extra cache-key parameters, builder). Builders
+# take the aggregate view (a Snapshot) and histogram_for(column, nbins), which
+# returns the (counts, edges) of a rating column for that view.
+DASHBOARD_CHARTS = {
+    'clubs': ({}, lambda view, histogram_for: clubs_figure(view.club_value)),
+    'overall': _histogram_chart('overall', 'Overall Rating Distribution', 'Overall Rating'),
+    'potential': _histogram_chart('potential', 'Potential Rating Distribution', 'Potential (POT)'),
+    'foot': ({}, lambda view, histogram_for: foot_figure(view.foot_counts)),
+    'age': ({}, lambda view, histogram_for: age_figure(view.age_counts)),
+    'map': ({}, lambda view, histogram_for: nationality_figure(view.country_counts)),
+    'leagues': ({}, lambda view, histogram_for: leagues_figure(view.league_counts)),
+    'workrate': ({}, lambda view, histogram_for: work_rate_figure(view.work_rate_counts)),
+    'body': ({}, lambda view, histogram_for: body_type_figure(view.body_type_counts)),
+}
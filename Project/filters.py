@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Numeric columns the sidebar sliders filter on
+RANGE_COLUMNS = ['overall', 'age']
+
+# Columns the filtered player table can be sorted by
+SORT_COLUMNS = ['overall', 'potential', 'value_eur', 'wage_eur', 'age']
+
+
+def build_position_index(player_positions):
+    """
+    Builds an inverted index {position: sorted int32 array of row numbers}
+    from the comma separated player_positions column (e.g. "RW, ST, CF").
+    Only the distinct strings are split; rows are collected through their codes.
+    """
+    codes, uniques = pd.factorize(player_positions)
+    unique_ids = {}
+    for unique_id, text in enumerate(uniques):
+        for position in str(text).split(','):
+            if position.strip():
+                unique_ids.setdefault(position.strip(), []).append(unique_id)
+
+    # Rows grouped by code: the rows of code i are order[starts[i]:starts[i + 1]]
+    valid = codes >= 0
+    order = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')].astype('int32')
+    starts = np.concatenate([[0], np.cumsum(np.bincount(codes[valid], minlength=len(uniques)))])
+
+    index = {}
+    for position, ids in unique_ids.items():
+        index[position] = np.sort(np.concatenate([order[starts[i]:starts[i + 1]] for i in ids]))
+    return index
+
+
+def rows_for_positions(position_index, positions):
+    """
+    Row numbers of players who can play any of the given positions, as a
+    sorted int32 array. Positions are matched exactly, so "B" never matches "CB".
+    """
+    arrays = [position_index[p] for p in positions if p in position_index]
+    if not arrays:
+        return np.zeros(0, dtype='int32')
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.unique(np.concatenate(arrays))
+
+
+class FilterEngine:
+    """
+    Answers sidebar filter queries with row numbers instead of frame copies.
+
+    Every range column keeps its argsort and sorted values, so a range
+    predicate is two searchsorted calls and a slice. Predicates are combined
+    as boolean masks and the resulting row numbers are kept in a bounded LRU
+    cache keyed by the normalized filter, shared by all sessions.
+
+    Sortable columns keep an argsort per direction (built on first use), so
+    a page of the filtered table is read off the pre-sorted order instead
+    of sorting the filtered rows.
+    """
+
+    def __init__(self, df, position_index, range_columns=RANGE_COLUMNS,
+                 sort_columns=SORT_COLUMNS, max_cached=128):
+        self.n_rows = len(df)
+        self.position_index = position_index
+        self.max_cached = max_cached
+        self._sorted = {}
+        for col in range_columns:
+            values = df[col].to_numpy(dtype='float64')
+            order = np.argsort(values, kind='stable')
+            self._sorted[col] = (order, values[order])
+        self._sort_values = {col: df[col].to_numpy(dtype='float64') for col in sort_columns}
+        self._sort_orders = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Pickled (for precomputed bundles) without the lock and the result cache
+        state = self.__dict__.copy()
+        del state['_cache'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def range_rows(self, column, low, high):
+        """Row numbers (unsorted) whose value lies in [low, high]."""
+        order, values = self._sorted[column]
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+        return order[start:stop]
+
+    def mask(self, positions=(), ranges=()):
+        """Boolean mask over all rows for the given positions and (column, low, high) ranges."""
+        if positions:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[rows_for_positions(self.position_index, positions)] = True
+        else:
+            mask = np.ones(self.n_rows, dtype=bool)
+        for column, low, high in ranges:
+            in_range = np.zeros(self.n_rows, dtype=bool)
+            in_range[self.range_rows(column, low, high)] = True
+            mask &= in_range
+        return mask
+
+    @staticmethod
+    def normalize(positions=(), ranges=()):
+        """Turns a filter into a hashable key that ignores selection order."""
+        return (tuple(sorted(set(positions))),
+                tuple(sorted((col, float(low), float(high)) for col, low, high in ranges)))
+
+    def select(self, positions=(), ranges=()):
+        """Sorted, read-only int array of the row numbers matching the filter (LRU cached)."""
+        key = self.normalize(positions, ranges)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        rows = np.flatnonzero(self.mask(*key))
+        rows.setflags(write=False)
+
+        with self._lock:
+            self._cache[key] = rows
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return rows
+
+    def sort_order(self, column, descending=False):
+        """All row numbers ordered by column (ties keep row order, missing values last)."""
+        key = (column, descending)
+        with self._lock:
+            order = self._sort_orders.get(key)
+        if order is None:
+            values = self._sort_values[column]
+            order = np.argsort(-values if descending else values, kind='stable').astype('int32')
+            order.setflags(write=False)
+            with self._lock:
+                self._sort_orders[key] = order
+        return order
+
+    def page(self, rows, column, descending=False, page=0, page_size=50):
+        """
+        Row numbers of one page of the filtered rows (as returned by select())
+        sorted by column. The pre-sorted order is scanned in blocks only until
+        the page is filled, so the cost grows with the page position and the
+        filter's selectivity, not with a sort of all matching rows.
+        """
+        start = page * page_size
+        stop = min(start + page_size, len(rows))
+        if start >= stop:
+            return np.zeros(0, dtype='int32')
+
+        order = self.sort_order(column, descending)
+        if len(rows) == self.n_rows:
+            return order[start:stop]
+
+        found = []
+        n_found = 0
+        block = max(4 * page_size, 4096)
+        for offset in range(0, self.n_rows, block):
+            chunk = order[offset:offset + block]
+            # rows is sorted, so membership is a binary search per candidate
+            positions = np.searchsorted(rows, chunk).clip(max=len(rows) - 1)
+            hits = chunk[rows[positions] == chunk]
+            found.append(hits)
+            n_found += len(hits)
+            if n_found >= stop:
+                break
+        return np.concatenate(found)[start:stop]
@@ -0,0 +1,163 @@
+"""
+Offline precompute for the dashboard.
+
+Builds every artifact the dashboard needs from a players CSV ahead of
+deployment, so a new replica only loads files on its first request instead
+of parsing the CSV and building indexes and figures.
+
+    python precompute.py players_22_cleaned.csv                  # writes bundle/
+    python precompute.py players_22_cleaned.csv --output /srv/bundle --season 22
+    python precompute.py players_21.csv --partition --season 21    # writes data/players_21.parquet
+
+Start the dashboard on a bundle with DASHBOARD_BUNDLE=<directory>.
+
+--partition converts the CSV into the typed Parquet season partition the
+season selector reads from data/ (--output defaults to data/ then). A plain
+players_<season>.csv in data/ works too; Parquet only loads faster.
+
+Bundle layout:
+    manifest.json   format, dataset version, source, season, rows, file sizes
+    players.arrow   typed columnar data (memory-mapped by the app)
+    artifacts.pkl   snapshot, position index, filter engine, aggregate cube,
+                    similarity and scatter indexes
+    figures.json    pre-rendered figures of the unfiltered dashboard
+
+artifacts.pkl is a pickle: only load bundles you built yourself.
+"""
+import argparse
+import json
+import os
+import pickle
+import re
+import sys
+import time
+
+from aggregates import AggregateCube, build_snapshot, histogram_bins
+from data_store import (SEASONS_DIRECTORY, dataset_version, read_arrow_file, read_players, write_arrow_file,
+                        write_season_partition)
+from figures import DASHBOARD_CHARTS
+from filters import SORT_COLUMNS, FilterEngine, build_position_index
+from scatter import ScatterIndex
+from similarity import SimilarityIndex
+
+# --- Configuration ---
+BUNDLE_FORMAT = 4
+DEFAULT_OUTPUT = 'bundle'
+
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_bundle(csv_path, output=DEFAULT_OUTPUT, season='22'):
+    """Builds the artifact bundle for a players CSV in output and returns its manifest."""
+    os.makedirs(output, exist_ok=True)
+    version = dataset_version(csv_path)
+
+    # Typed columnar data; everything below is built from the memory-mapped copy
+    arrow_path = write_arrow_file(read_players(csv_path), os.path.join(output, 'players.arrow'), version)
+    df = read_arrow_file(arrow_path)
+
+    position_index = build_position_index(df['player_positions'])
+    filter_engine = FilterEngine(df, position_index)
+    for column in SORT_COLUMNS:
+        for descending in (False, True):
+            filter_engine.sort_order(column, descending)
+
+    artifacts = {
+        'snapshot': build_snapshot(df),
+        'position_index': position_index,
+        'filter_engine': filter_engine,
+        'aggregate_cube': AggregateCube(df),
+        'similarity_index': SimilarityIndex(df),
+        'scatter_index': ScatterIndex(df),
+    }
+    _write_atomic(os.path.join(output, 'artifacts.pkl'),
+                  pickle.dumps(artifacts, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # Figures of the unfiltered dashboard, keyed the way the app's figure cache keys them
+    figures = []
+    for chart_id, (params, build) in DASHBOARD_CHARTS.items():
+        fig = build(artifacts['snapshot'], lambda column, nbins: histogram_bins(df[column].to_numpy(), nbins))
+        figures.append({'chart_id': chart_id, 'params': {'filter': None, **params},
+                        'figure': json.loads(fig.to_json())})
+    _write_atomic(os.path.join(output, 'figures.json'), json.dumps(figures).encode())
+
+    # The manifest goes last: a bundle without one is incomplete
+    files = ['players.arrow', 'artifacts.pkl', 'figures.json']
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': version,
+        'source': os.path.basename(csv_path),
+        'season': season,
+        'rows': len(df),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'files': {name: os.path.getsize(os.path.join(output, name)) for name in files},
+    }
+    _write_atomic(os.path.join(output, 'manifest.json'), json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def read_manifest(directory):
+    """Returns the manifest of a bundle, raising ValueError if it is missing or of another format."""
+    try:
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{directory} is not a complete dashboard bundle: {e}") from e
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{directory} has bundle format {manifest.get('format')}, expected {BUNDLE_FORMAT}")
+    return manifest
+
+
+def load_bundle(directory):
+    """
+    Loads a bundle: the manifest, the memory-mapped players frame ('df'),
+    every entry of artifacts.pkl and 'figures', a list of (chart_id, params, figure).
+    """
+    import plotly.graph_objects as go
+
+    manifest = read_manifest(directory)
+    with open(os.path.join(directory, 'artifacts.pkl'), 'rb') as f:
+        artifacts = pickle.load(f)
+    with open(os.path.join(directory, 'figures.json')) as f:
+        figures = [(entry['chart_id'], entry['params'], go.Figure(entry['figure'])) for entry in json.load(f)]
+    return {
+        'manifest': manifest,
+        'df': read_arrow_file(os.path.join(directory, 'players.arrow')),
+        **artifacts,
+        'figures': figures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the FIFA dashboard artifacts for a players CSV.")
+    parser.add_argument('csv', help="players CSV, e.g. players_22_cleaned.csv")
+    parser.add_argument('--output', help="bundle directory (default: bundle, or data with --partition)")
+    parser.add_argument('--season', default='22', help="season shown in the dashboard title")
+    parser.add_argument('--partition', action='store_true',
+                        help="write the Parquet season partition instead of a bundle")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.partition:
+        if not re.fullmatch(r'\d{2}', args.season):
+            parser.error("--partition needs a two-digit --season, e.g. 21")
+        path = write_season_partition(args.csv, args.season, args.output or SEASONS_DIRECTORY)
+        print(f"Season {args.season} partition written to {path} in {time.perf_counter() - start:.1f} s")
+        return 0
+
+    args.output = args.output or DEFAULT_OUTPUT
+    manifest = build_bundle(args.csv, args.output, args.season)
+    print(f"Bundle for {manifest['source']} ({manifest['rows']:,} rows, version {manifest['version'][:12]}) "
+          f"written to {args.output} in {time.perf_counter() - start:.1f} s")
+    for name, size in manifest['files'].items():
+        print(f"  {name:<14} {size / 1e6:8.2f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
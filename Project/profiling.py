@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+class SpanHistory:
+    """
+    Rolling per-span durations shared by all sessions, plus the optional
+    JSON-lines export. Only the last max_samples durations of each span are kept.
+    """
+
+    def __init__(self, max_samples=500, export_path=None):
+        self.max_samples = max_samples
+        self.export_path = export_path
+        self._samples = {}
+        self._lock = threading.Lock()
+        # One line-buffered handle for the export, with its own lock so file
+        # writes never hold up the sample recording of other sessions
+        self._export = open(export_path, 'a', buffering=1) if export_path else None
+        self._export_lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            samples = self._samples.setdefault(span['name'], deque(maxlen=self.max_samples))
+            samples.append(span['ms'])
+        if self._export is not None:
+            line = json.dumps(span) + '\n'
+            with self._export_lock:
+                self._export.write(line)
+
+    def percentiles(self):
+        """One row per span name with sample count and p50/p95/p99 in milliseconds."""
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items()}
+        rows = [
+            {'span': name, 'runs': len(values),
+             'p50_ms': np.percentile(values, 50),
+             'p95_ms': np.percentile(values, 95),
+             'p99_ms': np.percentile(values, 99)}
+            for name, values in samples.items()
+        ]
+        return pd.DataFrame(rows, columns=['span', 'runs', 'p50_ms', 'p95_ms', 'p99_ms'])
+
+
+class Profiler:
+    """Timing spans of one script run; every finished span is also added to the shared history."""
+
+    def __init__(self, history, session_id=None, started=None):
+        self.history = history
+        self.run_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.started = time.perf_counter() if started is None else started
+        self.spans = []
+
+    def _record(self, name, start, end):
+        span = {
+            'ts': time.time(),
+            'run_id': self.run_id,
+            'session_id': self.session_id,
+            'name': name,
+            'start_ms': round((start - self.started) * 1000, 3),
+            'ms': round((end - start) * 1000, 3),
+        }
+        self.spans.append(span)
+        self.history.record(span)
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def mark(self, name):
+        """Records a span from the start of the run to now, e.g. the time to the first metric."""
+        self._record(name, self.started, time.perf_counter())
+
+    def elapsed_ms(self, name):
+        """Duration of the first span of this run with the given name (None if not recorded)."""
+        return next((span['ms'] for span in self.spans if span['name'] == name), None)
+
+    def breakdown(self):
+        """Spans of this run in start order."""
+        return pd.DataFrame(self.spans, columns=['name', 'start_ms', 'ms'])
+
+    def to_jsonl(self):
+        return ''.join(json.dumps(span) + '\n' for span in self.spans)
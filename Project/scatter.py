@@ -0,0 +1,109 @@
+import numpy as np
+
+# --- Configuration ---
+# Most points sent to the browser per scatter view, and the grid the view is
+# divided into when there are more: every grid cell keeps some of its points,
+# so sparse regions and outliers survive while dense regions are thinned
+SCATTER_POINT_BUDGET = 5_000
+SCATTER_GRID = 80
+
+# Rating columns the value scatter can be drawn against
+SCATTER_X_COLUMNS = ['overall', 'potential']
+
+# Largest number of colour groups; smaller groups are merged into "Other"
+MAX_COLOR_GROUPS = 10
+
+
+def grid_sample(x, y, priority, budget, grid=SCATTER_GRID):
+    """
+    Boolean mask keeping at most budget of the points, spread over a grid x
+    grid raster of their bounding box. Cells with at most cap points keep
+    them all; a fuller cell keeps each point with probability cap / count,
+    decided by its fixed priority in [0, 1). cap is as large as the budget allows.
+    """
+    n_points = len(x)
+    if n_points <= budget:
+        return np.ones(n_points, dtype=bool)
+
+    def cell_of(values):
+        low, high = values.min(), values.max()
+        scaled = (values - low) / (high - low) * grid if high > low else np.zeros(n_points)
+        return np.minimum(scaled.astype('int64'), grid - 1)
+
+    cell = cell_of(x) * grid + cell_of(y)
+    counts = np.bincount(cell, minlength=grid * grid)
+
+    # Largest cap with sum(min(count, cap)) <= budget, by bisection
+    low, high = 1, int(counts.max())
+    while low < high:
+        mid = (low + high + 1) // 2
+        if np.minimum(counts, mid).sum() <= budget:
+            low = mid
+        else:
+            high = mid - 1
+
+    keep = priority < low / counts[cell]
+    # The sampling only meets the budget on average; drop the surplus with the highest priority
+    kept = np.flatnonzero(keep)
+    if len(kept) > budget:
+        keep[kept[np.argpartition(priority[kept], budget)[budget:]]] = False
+    return keep
+
+
+class ScatterIndex:
+    """
+    Range queries and downsampling for the value vs rating scatter.
+
+    Each rating column keeps its argsort and sorted values, so the rows in
+    the visible rating range are a slice. Every row also gets a fixed random
+    priority, so a view keeps the same points across reruns and zooming in
+    mostly adds points. The result of a query never exceeds the point budget: the
+    narrower the visible range, the more of its points are shown.
+    """
+
+    def __init__(self, df, x_columns=SCATTER_X_COLUMNS, y_column='value_eur', seed=0):
+        self.n_rows = len(df)
+        self.y = df[y_column].to_numpy(dtype='float64')
+        self.x = {col: df[col].to_numpy(dtype='float64') for col in x_columns}
+        self._sorted = {}
+        for col, values in self.x.items():
+            order = np.argsort(values, kind='stable')
+            self._sorted[col] = (order, values[order])
+        self.priority = np.random.default_rng(seed).random(self.n_rows)
+
+    def query(self, x_column, x_range, y_range, rows=None, budget=SCATTER_POINT_BUDGET):
+        """
+        Returns (row numbers to draw, number of players in the view) for the
+        players with x_column in x_range and a value in y_range, optionally
+        restricted to rows (e.g. FilterEngine.select() for the sidebar filter).
+        """
+        order, values = self._sorted[x_column]
+        start = np.searchsorted(values, x_range[0], side='left')
+        stop = np.searchsorted(values, x_range[1], side='right')
+        visible = order[start:stop]
+
+        y = self.y[visible]
+        visible = visible[(y >= y_range[0]) & (y <= y_range[1])]
+        if rows is not None:
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[rows] = True
+            visible = visible[selected[visible]]
+
+        # Values are drawn on a log axis, so the grid is laid out in log space too
+        keep = grid_sample(self.x[x_column][visible], np.log10(self.y[visible] + 1),
+                           self.priority[visible], budget)
+        return np.sort(visible[keep]), len(visible)
+
+
+def color_groups(df, rows, by):
+    """
+    Colour label per row: the league name, or the first listed position.
+    Only the MAX_COLOR_GROUPS - 1 largest groups among rows keep their own
+    label; the rest become "Other".
+    """
+    column = df['league_name'] if by == 'league' else df['player_positions']
+    labels = column.iloc[rows].astype(object).fillna('Unknown').astype(str)
+    if by != 'league':
+        labels = labels.str.split(',').str[0].str.strip()
+    top = labels.value_counts().index[:MAX_COLOR_GROUPS - 1]
+    return labels.where(labels.isin(top), 'Other').to_numpy()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+# Attributes two players are compared on; skill columns missing from the data are skipped
+BASE_COLUMNS = ['overall', 'potential', 'age', 'value_eur', 'wage_eur']
+SKILL_COLUMNS = ['pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic', 'skill_moves', 'weak_foot']
+SKILL_PREFIXES = ('attacking_', 'skill_', 'movement_', 'power_', 'mentality_', 'defending_', 'goalkeeping_')
+
+# Heavy-tailed columns compared on a log scale, so a 100M € player is not
+# infinitely far from a 50M € one while 1M € and 2M € players look alike
+LOG_COLUMNS = ['value_eur', 'wage_eur']
+
+
+def similarity_columns(df):
+    """The numeric attribute columns of df used for similarity, in a stable order."""
+    columns = [col for col in BASE_COLUMNS + SKILL_COLUMNS if col in df.columns]
+    columns += [col for col in df.columns if col.startswith(SKILL_PREFIXES) and col not in columns]
+    return [col for col in columns if pd.api.types.is_numeric_dtype(df[col])]
+
+
+class SimilarityIndex:
+    """
+    k-nearest-neighbour search over a normalized float32 attribute matrix.
+
+    Every attribute is standardized (z-score, money columns on a log scale)
+    and a missing attribute, such as pace for goalkeepers, is set to the
+    column mean. A query is a squared Euclidean distance computed as a
+    matrix-vector product over blocks of candidate rows, keeping only the
+    k best of each block, so memory stays bounded for millions of rows.
+    """
+
+    def __init__(self, df, columns=None, block_size=65_536):
+        self.columns = columns or similarity_columns(df)
+        self.block_size = block_size
+
+        matrix = np.empty((len(df), len(self.columns)), dtype='float32')
+        for i, col in enumerate(self.columns):
+            values = df[col].to_numpy(dtype='float64')
+            if col in LOG_COLUMNS:
+                values = np.log1p(np.clip(values, 0, None))
+            mean, std = np.nanmean(values), np.nanstd(values)
+            values = (values - mean) / (std if std > 0 else 1.0)
+            matrix[:, i] = np.nan_to_num(values, nan=0.0)
+        matrix.setflags(write=False)
+        self.matrix = matrix
+        self.sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    def _block_distances(self, rows, query):
+        """Squared distances from query to the given rows (a slice or a row-number array)."""
+        return self.sq_norms[rows] - 2 * (self.matrix[rows] @ query) + query @ query
+
+    def neighbours(self, row, k=10, rows=None):
+        """
+        Row numbers and distances of the k players closest to row, nearest
+        first. rows restricts the candidates (e.g. FilterEngine.select()
+        for the active sidebar filter); the player itself is never returned.
+        """
+        query = self.matrix[row]
+        n_candidates = len(self.matrix) if rows is None else len(rows)
+        best_rows, best_distances = np.zeros(0, dtype='int64'), np.zeros(0, dtype='float32')
+
+        for start in range(0, n_candidates, self.block_size):
+            stop = min(start + self.block_size, n_candidates)
+            block = np.arange(start, stop) if rows is None else np.asarray(rows[start:stop], dtype='int64')
+            distances = self._block_distances(slice(start, stop) if rows is None else block, query)
+            distances[block == row] = np.inf
+
+            # Keep the k best of this block, then the k best overall
+            if len(distances) > k:
+                keep = np.argpartition(distances, k)[:k]
+                block, distances = block[keep], distances[keep]
+            best_rows = np.concatenate([best_rows, block])
+            best_distances = np.concatenate([best_distances, distances])
+            if len(best_distances) > k:
+                keep = np.argpartition(best_distances, k)[:k]
+                best_rows, best_distances = best_rows[keep], best_distances[keep]
+
+        order = np.lexsort((best_rows, best_distances))
+        best_rows, best_distances = best_rows[order], best_distances[order]
+        found = np.isfinite(best_distances)
+        return best_rows[found], np.sqrt(np.maximum(best_distances[found], 0))
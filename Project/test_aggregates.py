@@ -0,0 +1,107 @@
+"""
+Tests for the cross-filter cube in aggregates.py: every filtered query must
+match build_snapshot() and histogram_bins() run on the filtered rows.
+
+    python -m pytest test_aggregates.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import AggregateCube, build_snapshot, histogram_bins
+from data_store import add_derived_columns, optimize_dtypes
+from filters import FilterEngine, build_position_index
+
+FILTERS = [
+    ((), ()),
+    (('ST',), ()),
+    (('CB', 'LB'), ()),
+    (('GK',), (('overall', 70, 99),)),
+    ((), (('overall', 60, 75), ('age', 20, 30))),
+    (('RW', 'ST', 'CF'), (('age', 18, 24),)),
+    (('LW',), (('overall', 99, 99),)),  # no player matches
+]
+
+
+def make_players(n=2000, seed=0):
+    """A small players frame with the columns the dashboard reads, typed like the real data."""
+    rng = np.random.default_rng(seed)
+    position_sets = ['ST', 'RW, ST, CF', 'CF, ST', 'CB', 'LB, CB', 'CB, LB', 'GK', 'CM, CDM', 'LW', 'RB, RWB']
+    value = rng.integers(1, 200, n) * 50_000.0
+    value[rng.random(n) < 0.05] = np.nan
+    wage = rng.integers(1, 100, n) * 1_000.0
+    wage[rng.random(n) < 0.05] = np.nan
+    overall = rng.integers(50, 92, n)
+    positions = rng.choice(position_sets, n).astype(object)
+    positions[rng.random(n) < 0.02] = None
+    df = pd.DataFrame({
+        'short_name': [f"P. Player{i}" for i in range(n)],
+        'club_name': rng.choice([f"Club {i}" for i in range(40)], n),
+        'nationality_name': rng.choice(['England', 'Brazil', 'France', 'Spain', 'Argentina'], n),
+        'league_name': rng.choice(['Premier League', 'La Liga', 'Serie A', 'Ligue 1'], n),
+        'work_rate': rng.choice(['High/Medium', 'Medium/Medium', 'Low/High'], n),
+        'body_type': rng.choice(['Lean', 'Normal', 'Stocky'], n),
+        'preferred_foot': rng.choice(['Left', 'Right'], n),
+        'player_positions': positions,
+        'overall': overall,
+        'potential': overall + rng.integers(0, 10, n),
+        'age': rng.integers(17, 40, n),
+        'value_eur': value,
+        'wage_eur': wage,
+    })
+    return add_derived_columns(optimize_dtypes(df))
+
+
+@pytest.fixture(scope='module')
+def players():
+    df = make_players()
+    engine = FilterEngine(df, build_position_index(df['player_positions']))
+    return df, engine, AggregateCube(df)
+
+
+def assert_counts_equal(actual, expected):
+    """Compares count/sum Series ignoring the order of ties and zero entries."""
+    actual, expected = actual[actual != 0], expected[expected != 0]
+    pd.testing.assert_series_equal(actual.sort_index().astype('float64'), expected.sort_index().astype('float64'),
+                                   check_names=False, check_index_type=False, check_categorical=False)
+
+
+@pytest.mark.parametrize('positions, ranges', FILTERS)
+def test_cube_matches_filtered_snapshot(players, positions, ranges):
+    df, engine, cube = players
+    key = engine.normalize(positions, ranges)
+    snapshot, _ = cube.query(key)
+    expected = build_snapshot(df.iloc[engine.select(*key)])
+
+    assert snapshot.total_players == expected.total_players
+    for name in ('avg_value', 'avg_wage', 'max_value', 'max_wage'):
+        assert getattr(snapshot, name) == pytest.approx(getattr(expected, name))
+    assert snapshot.top_value_player == expected.top_value_player
+    assert snapshot.top_wage_player == expected.top_wage_player
+    for name in ('foot_counts', 'nationality_counts', 'league_counts', 'work_rate_counts',
+                 'body_type_counts', 'country_counts', 'club_value'):
+        assert_counts_equal(getattr(snapshot, name), getattr(expected, name))
+    assert list(snapshot.age_counts) == list(expected.age_counts)
+
+
+@pytest.mark.parametrize('positions, ranges', FILTERS)
+@pytest.mark.parametrize('column', ['overall', 'potential'])
+def test_cube_histograms_match_filtered_rows(players, positions, ranges, column):
+    df, engine, cube = players
+    key = engine.normalize(positions, ranges)
+    _, histograms = cube.query(key)
+    values, weights = histograms[column]
+    counts, edges = histogram_bins(values, 30, weights=weights)
+    expected_counts, expected_edges = histogram_bins(df[column].to_numpy()[engine.select(*key)], 30)
+
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(edges, expected_edges)
+
+
+def test_position_sets_ignore_order_and_spacing():
+    df = make_players(200)
+    df['player_positions'] = pd.Categorical(['CB, LB', 'LB,CB', ' LB , CB', None] * 50)
+    cube = AggregateCube(df)
+    assert sorted(map(sorted, cube.combo_positions)) == [[], ['CB', 'LB']]
+    snapshot, _ = cube.query((('LB',), ()))
+    assert snapshot.total_players == 150
@@ -0,0 +1,64 @@
+"""
+Tests for the position index and FilterEngine in filters.py against plain
+pandas references: boolean masks for select(), a stable sort for page().
+
+    python -m pytest test_filters.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from filters import SORT_COLUMNS, FilterEngine, build_position_index
+from test_aggregates import FILTERS, make_players
+
+
+@pytest.fixture(scope='module')
+def players():
+    # Enough rows for page() to scan its pre-sorted order in more than one block
+    df = make_players(10_000)
+    return df, FilterEngine(df, build_position_index(df['player_positions']), max_cached=2)
+
+
+def reference_mask(df, positions, ranges):
+    """The filter as a boolean mask built row by row from the raw columns."""
+    position_sets = df['player_positions'].astype(object).map(
+        lambda text: {p.strip() for p in text.split(',')} if isinstance(text, str) else set())
+    mask = position_sets.map(lambda found: not positions or bool(found & set(positions))).to_numpy(dtype=bool)
+    for column, low, high in ranges:
+        mask &= df[column].between(low, high).to_numpy()
+    return mask
+
+
+def test_position_index_matches_exactly(players):
+    df, engine = players
+    for position, rows in engine.position_index.items():
+        assert rows.dtype == np.int32
+        assert np.all(np.diff(rows) > 0)
+        np.testing.assert_array_equal(rows, np.flatnonzero(reference_mask(df, (position,), ())))
+    assert 'B' not in engine.position_index
+
+
+@pytest.mark.parametrize('positions, ranges', FILTERS)
+def test_select_matches_boolean_mask(players, positions, ranges):
+    df, engine = players
+    expected = np.flatnonzero(reference_mask(df, positions, ranges))
+    np.testing.assert_array_equal(engine.select(positions, ranges), expected)
+    # Same filter in another order hits the cache and gives the same rows
+    np.testing.assert_array_equal(engine.select(positions[::-1], ranges[::-1]), expected)
+
+
+@pytest.mark.parametrize('positions, ranges', [((), ()), (('ST',), ()), (('CB',), (('age', 20, 30),))])
+@pytest.mark.parametrize('column', SORT_COLUMNS)
+@pytest.mark.parametrize('descending', [False, True])
+def test_page_matches_stable_sort(players, positions, ranges, column, descending):
+    df, engine = players
+    rows = engine.select(positions, ranges)
+    expected = df.iloc[rows].reset_index(drop=True)[column] \
+        .sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+    expected = rows[expected]
+
+    page_size = 25
+    for page in [0, 1, len(rows) // page_size]:
+        np.testing.assert_array_equal(engine.page(rows, column, descending, page, page_size),
+                                      expected[page * page_size:(page + 1) * page_size])
+    assert len(engine.page(rows, column, descending, len(rows) // page_size + 1, page_size)) == 0